@@ -1,13 +1,23 @@
-import tkinter as tk
-from tkinter import messagebox, filedialog
-import json, os, threading, time, psutil, pyautogui, pystray
-from PIL import Image, ImageDraw
+import time
+_STARTUP_T0 = time.perf_counter()
+import json, os, re, sys, bisect, gzip, lzma, queue, select, shutil, struct, sqlite3, hashlib, zlib, threading, heapq, itertools, multiprocessing, psutil
 from pathlib import Path
+from datetime import datetime
 from enum import Enum
-from typing import Optional, Callable
+from collections import OrderedDict, deque
+from typing import Optional, Callable, BinaryIO, Iterator, NamedTuple
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor
 
-import customtkinter
-import tkfontawesome as fa 
+# Only running app.py reads the command line. Importing it (tests, bench/, the compression pool
+# re-importing it as __mp_main__) never touches sys.argv and never loads Tk or the tray stack.
+_ARGV = sys.argv[1:] if __name__ == "__main__" else []
+# `app.py ctl ...` talks to the running instance over the control channel;
+# `app.py journal ...` queries the activity journal; `app.py restore ...` rebuilds a deduplicated backup.
+SUBCOMMAND = _ARGV[0] if _ARGV[:1] in (["ctl"], ["journal"], ["restore"]) else None
+# Headless mode runs the engine on a plain loop; so do the focus-trace replay (--replay) and the subcommands.
+HEADLESS = __name__ != "__main__" or SUBCOMMAND is not None or any(flag in _ARGV for flag in ("--headless", "--replay"))
+# Prints import time and time-to-first-frame, then exits; the hook bench/bench_startup.py launches.
+MEASURE_STARTUP = "--measure-startup" in _ARGV
 
 try:
     from win32gui import GetForegroundWindow, GetWindowText
@@ -18,9 +28,22 @@ try:
 except ImportError:
     WINDOWS_API_AVAILABLE = False
 
-# --- App Appearance Setup ---
-customtkinter.set_appearance_mode("dark")
-customtkinter.set_default_color_theme("green")
+try:
+    from Xlib import X, Xatom, display as xdisplay
+    from Xlib.error import XError
+    XLIB_AVAILABLE = True
+except ImportError:
+    XLIB_AVAILABLE = False
+
+# pyautogui (fallback injector), pystray, PIL and tkfontawesome are imported on first use (see _pyautogui, TrayManager, IconCache).
+_pyautogui_module = None
+
+def _pyautogui():
+    global _pyautogui_module
+    if _pyautogui_module is None:
+        import pyautogui
+        _pyautogui_module = pyautogui
+    return _pyautogui_module
 
 class Config:
     """Central configuration for the application."""
@@ -28,9 +51,16 @@ class Config:
         NAME, VERSION = "NIT Personal Assistant", "Version: v0.8"
         GEOMETRY_COLLAPSED, GEOMETRY_EXPANDED = "350x420", "350x520" 
         FOLDER_NAME, SETTINGS_FILE = "NitPersonalAssistant", "config.json"
+        ICON_CACHE_DIR = "icon_cache"
+        LOCK_FILE, CONTROL_KEY_FILE, CONTROL_SOCKET = "instance.lock", "control.key", "control.sock"
         BACKGROUND_COLOR = "#0F172A"
 
     class UI:
+        LOG_CAPACITY = 500  # lines kept in the Activity Log ring buffer and widget
+        LOG_FLUSH_MS = 250
+        EVENT_DRAIN_MS = 50  # cadence at which the UI thread drains engine events
+        FOOTER_ANIMATION_FPS = 8  # default for the 'footer_animation_fps' setting; 0 disables it
+
         class Theme:
             PRIMARY = "#27ae60"
             ACCENT_RED = "#e74c3c"
@@ -40,6 +70,56 @@ class Config:
             PRIMARY_DISABLED = "#2a6a43"
             ICON_DISABLED = "#6b7280" 
 
+    class Monitor:
+        NAME_CACHE_SIZE = 256  # (pid, create_time) -> process name entries
+        POLL_INTERVAL = 2.0  # seconds, only used when no event-driven backend works
+
+    class Backup:
+        FOLDER_NAME = "Smart Backup"
+        COPY_CHUNK = 8 * 1024 * 1024  # bytes per copy_file_range/sendfile call
+        COPY_RETRIES = 2  # re-copy if the source changes mid-copy
+        STORE_DIR, MANIFEST_SUFFIX = ".chunks", ".manifest.json"
+        CHUNK_MIN, CHUNK_AVG, CHUNK_MAX = 256 * 1024, 1024 * 1024, 4 * 1024 * 1024
+        READ_BLOCK = 1024 * 1024
+        CHUNK_ANCHOR, CHUNK_WINDOW = 0x9C, 48  # candidate cut byte and the window hashed behind it
+        CHUNK_MAX_PROBES = 16384  # per chunk; bounds the cost on inputs full of anchor bytes
+        CATALOG_FILE = "backup_catalog.db"
+        COMPRESSION_SUFFIXES = {'zstd': ".zst", 'lzma': ".xz"}
+        COMPRESSION_LEVELS = {'zstd': 9, 'lzma': 6}
+        DOCUMENT_EXTENSIONS = {
+            '.psd', '.psb', '.aep', '.aet', '.prproj', '.ai', '.eps', '.indd', '.idml', '.pdf', '.fla', '.xfl',
+            '.lrcat', '.sesx', '.fig', '.drp', '.draft', '.svg', '.tif', '.tiff', '.png', '.jpg', '.jpeg'
+        }
+        RESOLVER_CACHE_SIZE = 128  # (pid, window title) -> document path entries
+        RESOLVER_MISS_TTL = 5.0  # seconds an unresolved window is remembered before asking again
+
+    class Save:
+        MAX_NOOP_BACKOFF = 8  # ticks skipped after repeated no-op saves in apps without a '*' marker
+        # Adaptive mode: keep saving under ~1/COST_FACTOR of wall time, stretch when clean, go long when idle.
+        COST_FACTOR, STRETCH_FACTOR, IDLE_THRESHOLD, COST_EWMA_ALPHA = 20, 1.5, 60.0, 0.3
+        # Save verification: inotify where available, else poll (mtime, size) until it settles.
+        VERIFY_POLL_INTERVAL, VERIFY_SETTLE_POLLS, VERIFY_TIMEOUT = 0.1, 3, 30.0
+        LATENCY_WINDOW = 256  # recent saves kept for the rolling save-latency percentiles
+
+    class Metrics:
+        EXPORT_INTERVAL = 30.0
+        PROM_FILE, JSON_FILE = "metrics.prom", "metrics.json"
+        PREFIX = "nit_autosave_"
+
+    class Control:
+        TIMEOUT = 5.0  # seconds a command may wait for the engine thread
+        CONNECT_RETRIES, RETRY_DELAY = 20, 0.1  # covers an instance that holds the lock but is still starting
+
+    class Journal:
+        DIR_NAME = "journal"
+        SEGMENT_BYTES, MAX_SEGMENTS = 4 * 1024 * 1024, 32
+        INDEX_STRIDE = 64 * 1024  # bytes between sparse time-index entries (and gzip members once rotated)
+        FLUSH_INTERVAL, FLUSH_RECORDS = 2.0, 256
+
+    class Settings:
+        RELOAD_CHECK_INTERVAL = 2.0  # seconds between config.json mtime/size checks
+        WRITE_DEBOUNCE = 0.5  # seconds save() calls are coalesced before one atomic write
+
 class LogLevel(Enum):
     SUCCESS = (Config.UI.Theme.PRIMARY, "")
     WARNING = (Config.UI.Theme.WARNING, "")
@@ -49,26 +129,229 @@ class LogLevel(Enum):
     ACTIVE = ("#e67e22", "")
     SAVE = ("#2ecc71", "")
 
-class AppUI(customtkinter.CTk):
-    instance = None
+def app_data_dir() -> Path:
+    path = Path(os.getenv('APPDATA', '.')) / Config.App.FOLDER_NAME
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+# --- Single instance & control channel ---
+# Launches hold an exclusive lock in the app data folder; a second launch asks the running instance
+# to show itself over a local socket (named pipe on Windows) and exits before Tk is imported.
+class InstanceLock:
+    def __init__(self, path: Path):
+        self._path = path
+        self._file = None
+    def acquire(self) -> bool:
+        f = open(self._path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+    def release(self):
+        if self._file:
+            self._file.close()  # closing drops the lock on both platforms
+            self._file = None
+
+def control_address() -> str:
+    if os.name == 'nt':
+        return rf"\\.\pipe\{Config.App.FOLDER_NAME}-{os.getenv('USERNAME', 'user')}"
+    return str(app_data_dir() / Config.App.CONTROL_SOCKET)
+
+def send_control(command: str, *args: str, retries: int = Config.Control.CONNECT_RETRIES) -> Optional[dict]:
+    """Sends one command to the running instance; returns its reply, or None if none is reachable."""
+    from multiprocessing.connection import Client
+    for attempt in range(retries + 1):
+        try:
+            authkey = (app_data_dir() / Config.App.CONTROL_KEY_FILE).read_bytes()
+            with Client(control_address(), authkey=authkey) as conn:
+                conn.send({'cmd': command, 'args': list(args)})
+                return conn.recv()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            if attempt < retries: 
+                time.sleep(Config.Control.RETRY_DELAY)
+    return None
+
+class ControlServer:
+    """Serves control commands; handlers run through `dispatch` on the engine's thread."""
+    def __init__(self, handlers: dict[str, Callable], dispatch: Callable[[int, Callable], object]):
+        self._handlers, self._dispatch = handlers, dispatch
+        self._listener = None
+        self._authkey = b""
+        self._running = False
+    def start(self):
+        from multiprocessing.connection import Listener
+        address = control_address()
+        if os.name != 'nt':
+            try: 
+                os.unlink(address)  # stale socket from a crashed run; we hold the instance lock
+            except FileNotFoundError: 
+                pass
+        self._authkey = os.urandom(32)
+        key_path = app_data_dir() / Config.App.CONTROL_KEY_FILE
+        fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as f: 
+            f.write(self._authkey)
+        self._listener = Listener(address, authkey=self._authkey)
+        self._running = True
+        threading.Thread(target=self._serve, name="ControlServer", daemon=True).start()
+    def _serve(self):
+        while self._running:
+            try: 
+                conn = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError): 
+                continue
+            with conn:
+                try: 
+                    conn.send(self._handle(conn.recv()))
+                except (OSError, EOFError): 
+                    pass
+    def _handle(self, request) -> dict:
+        command, args = request.get('cmd'), request.get('args', [])
+        handler = self._handlers.get(command)
+        if handler is None: 
+            return {'ok': False, 'error': f"unknown command: {command}"}
+        future: Future = Future()
+        def run():
+            try: 
+                future.set_result(handler(*args))
+            except Exception as e: 
+                future.set_exception(e)
+        self._dispatch(0, run)
+        try: 
+            return {'ok': True, 'result': future.result(timeout=Config.Control.TIMEOUT)}
+        except Exception as e: 
+            return {'ok': False, 'error': str(e) or type(e).__name__}
+    def stop(self):
+        if not self._running: 
+            return
+        self._running = False
+        try:
+            # accept() isn't interrupted by close() on every platform; a throwaway connection wakes it.
+            from multiprocessing.connection import Client
+            Client(control_address(), authkey=self._authkey).close()
+        except (OSError, EOFError, multiprocessing.AuthenticationError):
+            pass
+        self._listener.close()
+
+def run_ctl(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="app.py ctl", description="Control the running instance.")
+    parser.add_argument('command', choices=['status', 'pause', 'resume', 'add-app', 'reload', 'show'])
+    parser.add_argument('args', nargs='*', help="executable paths or names for add-app")
+    opts = parser.parse_args(argv)
+    reply = send_control(opts.command, *opts.args, retries=0)
+    if reply is None:
+        print("No running instance.", file=sys.stderr)
+        return 2
+    if not reply['ok']:
+        print(f"Error: {reply['error']}", file=sys.stderr)
+        return 1
+    if reply['result'] is not None: 
+        print(json.dumps(reply['result'], indent=2))
+    return 0
+
+INSTANCE_LOCK: Optional[InstanceLock] = None
+if __name__ == "__main__" and multiprocessing.current_process().name == "MainProcess" \
+        and "--replay" not in _ARGV and SUBCOMMAND not in ("journal", "restore"):
+    if SUBCOMMAND == "ctl":
+        sys.exit(run_ctl(_ARGV[1:]))
+    INSTANCE_LOCK = InstanceLock(app_data_dir() / Config.App.LOCK_FILE)
+    if not INSTANCE_LOCK.acquire():
+        reply = send_control('show')
+        print("Already running; asked it to show its window." if reply and reply['ok'] else "Another instance holds the lock but isn't answering.")
+        sys.exit(0 if reply and reply['ok'] else 1)
+
+if HEADLESS:
+    _WindowBase = object
+else:
+    import tkinter as tk
+    from tkinter import messagebox, filedialog
+    import customtkinter
+    _WindowBase = customtkinter.CTk
+
+    # --- App Appearance Setup ---
+    customtkinter.set_appearance_mode("dark")
+    customtkinter.set_default_color_theme("green")
+
+_IMPORT_MS = (time.perf_counter() - _STARTUP_T0) * 1000
+
+class IconCache:
+    """Rasterized Font Awesome icons, memoized in-process and as PNGs on disk keyed by name/size/color."""
+    def __init__(self, cache_dir: Path):
+        self._dir = cache_dir
+        self._memo: dict[tuple[str, int, str], "tk.PhotoImage"] = {}
+    def get(self, name: str, width: int, fill: str) -> "tk.PhotoImage":
+        key = (name, width, fill)
+        image = self._memo.get(key)
+        if image is not None: 
+            return image
+        path = self._dir / f"{name}-{width}-{fill.lstrip('#').lower()}.png"
+        if path.is_file():
+            try: 
+                image = tk.PhotoImage(file=str(path))
+            except tk.TclError: 
+                image = None
+        if image is None:
+            import tkfontawesome as fa
+            image = fa.icon_to_image(name=name, scale_to_width=width, fill=fill)
+            try:
+                self._dir.mkdir(parents=True, exist_ok=True)
+                image.write(str(path), format="png")
+            except (tk.TclError, OSError):
+                pass
+        self._memo[key] = image
+        return image
+
+class AppUI(_WindowBase):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        AppUI.instance = self
         
         self.configure(fg_color=Config.App.BACKGROUND_COLOR)
+        self.icons = IconCache(app_data_dir() / Config.App.ICON_CACHE_DIR)
 
-        self.script = AutoSaveScript(self.add_log, self.update_status)
+        self.engine_events = EngineEventQueue()
+        self._status_revert_id = None
+        self.script = AutoSaveScript(self.engine_events.dispatch)
+        self.script.events.subscribe(self.engine_events)
         self.tray_manager = TrayManager(self._schedule_show_from_tray, self._schedule_quit_application)
         self.window_hidden = False
         self.log_expanded = False
+        self._log_ring: deque[str] = deque(maxlen=Config.UI.LOG_CAPACITY)
+        self._log_lock = threading.Lock()
+        self._log_seq = self._log_rendered_seq = 0
+        self._log_flush_id = None
 
         self._configure_root_style()
         self._create_widgets()
         
         self.protocol("WM_DELETE_WINDOW", self.hide_to_tray)
         self.script.start()
+        self.control = ControlServer(dict(self.script.control_handlers(), show=self._raise_window), self.engine_events.dispatch)
+        try: 
+            self.control.start()
+        except OSError as e: 
+            self.add_log(f"Control channel unavailable: {e}", LogLevel.WARNING)
         self.update_status("Initializing...", "INITIALIZING")
         self._animate_gradient()
+        self.after_idle(self._report_startup_time)
+        self._drain_engine_events()
+
+    def _report_startup_time(self):
+        self.update_idletasks()
+        first_frame_ms = (time.perf_counter() - _STARTUP_T0) * 1000
+        self.add_log(f"Startup: imports {_IMPORT_MS:.0f} ms, first frame {first_frame_ms:.0f} ms", LogLevel.INFO)
+        if MEASURE_STARTUP:
+            print(f"import_ms={_IMPORT_MS:.1f} first_frame_ms={first_frame_ms:.1f}", flush=True)
+            self.quit_application()
 
     def _configure_root_style(self):
         self.title(Config.App.NAME)
@@ -115,7 +398,7 @@ class AppUI(customtkinter.CTk):
         header_frame = customtkinter.CTkFrame(content, fg_color="transparent")
         header_frame.pack(anchor="w")
         
-        status_icon = fa.icon_to_image(name="chart-line", scale_to_width=18, fill="white") 
+        status_icon = self.icons.get("chart-line", 18, "white") 
         
         customtkinter.CTkLabel(header_frame, text="", image=status_icon).pack(side="left")
         customtkinter.CTkLabel(header_frame, text=" System Status", font=customtkinter.CTkFont(size=12, weight="bold")).pack(side="left", padx=5)
@@ -136,8 +419,8 @@ class AppUI(customtkinter.CTk):
         
         content_frame.grid_columnconfigure((0, 1), weight=1)
         
-        exit_icon = fa.icon_to_image(name="power-off", scale_to_width=16, fill="white")
-        tools_icon = fa.icon_to_image(name="sliders-h", scale_to_width=16, fill="white")
+        exit_icon = self.icons.get("power-off", 16, "white")
+        tools_icon = self.icons.get("sliders-h", 16, "white")
 
         customtkinter.CTkButton(content_frame, text=" Exit", image=exit_icon, compound="left",
                               fg_color=Config.UI.Theme.ACCENT_RED, hover_color="#c0392b",
@@ -152,8 +435,8 @@ class AppUI(customtkinter.CTk):
         log_header_fr = customtkinter.CTkFrame(self.log_fr, fg_color="transparent")
         log_header_fr.pack(fill="x", padx=15, pady=(10, 5))
         
-        self.icon_log_closed = fa.icon_to_image(name="chevron-right", scale_to_width=12, fill="white")
-        self.icon_log_open = fa.icon_to_image(name="chevron-down", scale_to_width=12, fill="white")
+        self.icon_log_closed = self.icons.get("chevron-right", 12, "white")
+        self.icon_log_open = self.icons.get("chevron-down", 12, "white")
         
         self.log_toggle_button = customtkinter.CTkButton(
             log_header_fr,
@@ -207,26 +490,57 @@ class AppUI(customtkinter.CTk):
         ]
         self.gradient_colors = self._create_smooth_gradient(theme_palette, steps_between=30)
         
-        self.gradient_labels = []
         self.gradient_offset = 0
+        self._gradient_after_id = None
         footer_text = "Developed By Erfan Fazeli For NIT TM"
-        footer_font = customtkinter.CTkFont(size=12, weight="bold")
+        scaling = customtkinter.ScalingTracker.get_widget_scaling(self)
+        # A raw canvas gets no widget scaling, so scale the font here to match the CTk labels.
+        footer_font = customtkinter.CTkFont(size=round(12 * scaling), weight="bold")
 
+        self.gradient_canvas = tk.Canvas(gradient_frame, bg=Config.App.BACKGROUND_COLOR, highlightthickness=0, bd=0)
+        self.gradient_canvas.pack()
+        char_ids, x = [], 0
         for char in footer_text:
-            label = customtkinter.CTkLabel(gradient_frame, text=char, font=footer_font)
-            label.pack(side="left")
-            self.gradient_labels.append(label)
+            char_ids.append(self.gradient_canvas.create_text(x, 0, text=char, anchor="nw", font=footer_font))
+            x += footer_font.measure(char)
+        self.gradient_canvas.configure(width=x, height=footer_font.metrics("linespace"))
+
+        # One Tcl script per frame, so each animation step is a single call into Tk.
+        canvas_path, num_colors = str(self.gradient_canvas), len(self.gradient_colors)
+        self._gradient_frames = [
+            "\n".join(f"{canvas_path} itemconfigure {item} -fill {self.gradient_colors[(i * 2 - frame) % num_colors]}"
+                      for i, item in enumerate(char_ids))
+            for frame in range(num_colors)
+        ]
+        self.tk.eval(self._gradient_frames[0])
+        self.bind("<Map>", self._on_window_map, add="+")
+        self.bind("<Unmap>", self._on_window_map, add="+")
+
+    def _on_window_map(self, event):
+        if event.widget is not self:
+            return
+        if event.type == tk.EventType.Unmap:
+            self._pause_gradient()
+        else:
+            self._resume_gradient()
+
+    def _resume_gradient(self):
+        if self._gradient_after_id is None:
+            self._animate_gradient()
+
+    def _pause_gradient(self):
+        if self._gradient_after_id:
+            self.after_cancel(self._gradient_after_id)
+            self._gradient_after_id = None
 
     def _animate_gradient(self):
-        num_labels = len(self.gradient_labels)
-        num_colors = len(self.gradient_colors)
-        
-        for i, label in enumerate(self.gradient_labels):
-            color_index = (i * 2 + self.gradient_offset) % num_colors
-            label.configure(text_color=self.gradient_colors[color_index])
-            
-        self.gradient_offset = (self.gradient_offset - 1) % num_colors
-        self.after(120, self._animate_gradient)
+        self._gradient_after_id = None
+        fps = self.script.settings.get('footer_animation_fps', Config.UI.FOOTER_ANIMATION_FPS)
+        if fps <= 0 or self.window_hidden or self.state() == "iconic":
+            return
+        self.tk.eval(self._gradient_frames[self.gradient_offset])
+        self.gradient_offset = (self.gradient_offset + 1) % len(self._gradient_frames)
+        self._gradient_after_id = self.after(max(1, round(1000 / fps)), self._animate_gradient)
 
     def _open_settings_dialog(self):
         dialog = customtkinter.CTkToplevel(self)
@@ -245,14 +559,14 @@ class AppUI(customtkinter.CTk):
         main_frame = customtkinter.CTkFrame(dialog, fg_color="transparent")
         main_frame.pack(fill="both", expand=True, padx=20, pady=20)
         
-        general_icon = fa.icon_to_image(name="sliders-h", scale_to_width=18, fill="white")
-        automation_icon = fa.icon_to_image(name="microchip", scale_to_width=18, fill="white")
-        actions_icon = fa.icon_to_image(name="folder-plus", scale_to_width=18, fill="white")
+        general_icon = self.icons.get("sliders-h", 18, "white")
+        automation_icon = self.icons.get("microchip", 18, "white")
+        actions_icon = self.icons.get("folder-plus", 18, "white")
         
-        icon_plus_enabled = fa.icon_to_image(name="plus", scale_to_width=14, fill=Config.UI.Theme.PRIMARY)
-        icon_plus_disabled = fa.icon_to_image(name="plus", scale_to_width=14, fill=Config.UI.Theme.ICON_DISABLED)
-        icon_minus_enabled = fa.icon_to_image(name="minus", scale_to_width=14, fill=Config.UI.Theme.PRIMARY)
-        icon_minus_disabled = fa.icon_to_image(name="minus", scale_to_width=14, fill=Config.UI.Theme.ICON_DISABLED)
+        icon_plus_enabled = self.icons.get("plus", 14, Config.UI.Theme.PRIMARY)
+        icon_plus_disabled = self.icons.get("plus", 14, Config.UI.Theme.ICON_DISABLED)
+        icon_minus_enabled = self.icons.get("minus", 14, Config.UI.Theme.PRIMARY)
+        icon_minus_disabled = self.icons.get("minus", 14, Config.UI.Theme.ICON_DISABLED)
 
         general_card = customtkinter.CTkFrame(main_frame)
         general_card.pack(fill="x", pady=(0, 15), ipady=10)
@@ -413,11 +727,46 @@ class AppUI(customtkinter.CTk):
             self.geometry(Config.App.GEOMETRY_EXPANDED)
             self.log_toggle_button.configure(image=self.icon_log_open)
         self.log_expanded = not self.log_expanded
+        self._flush_log()
+
+    def _drain_engine_events(self):
+        logs, status, calls = self.engine_events.drain()
+        for message, level in logs:
+            self.add_log(message, level)
+        if status:
+            self.update_status(*status)
+        for delay_ms, callback in calls:
+            self.after(delay_ms, callback)
+        self.after(Config.UI.EVENT_DRAIN_MS, self._drain_engine_events)
 
     def add_log(self, message: str, level: LogLevel):
-        self.log_text.configure(state="normal")
+        # Safe from any thread: entries land in the ring buffer and _flush_log renders them in batches.
         log_entry = f"[{time.strftime('%H:%M:%S')}] {message}\n"
-        self.log_text.insert(tk.END, log_entry)
+        with self._log_lock:
+            self._log_ring.append(log_entry)
+            self._log_seq += 1
+
+    def _flush_log(self):
+        if self._log_flush_id:
+            self.after_cancel(self._log_flush_id)
+            self._log_flush_id = None
+        if not self.log_expanded or self.window_hidden:
+            return
+        self._log_flush_id = self.after(Config.UI.LOG_FLUSH_MS, self._flush_log)
+        with self._log_lock:
+            new_count = self._log_seq - self._log_rendered_seq
+            if not new_count:
+                return
+            rebuild = new_count >= len(self._log_ring)
+            entries = "".join(itertools.islice(self._log_ring, 0 if rebuild else len(self._log_ring) - new_count, None))
+            self._log_rendered_seq = self._log_seq
+        self.log_text.configure(state="normal")
+        if rebuild:
+            self.log_text.delete("1.0", tk.END)
+        self.log_text.insert(tk.END, entries)
+        line_count = int(self.log_text.index("end-1c").split(".")[0])
+        if line_count > Config.UI.LOG_CAPACITY + 1:
+            self.log_text.delete("1.0", f"{line_count - Config.UI.LOG_CAPACITY}.0")
         self.log_text.see(tk.END)
         self.log_text.configure(state="disabled")
 
@@ -428,8 +777,11 @@ class AppUI(customtkinter.CTk):
             "PAUSED": Config.UI.Theme.WARNING, "SAVED": Config.UI.Theme.INFO
         }
         self.status_label.configure(text_color=status_colors.get(status_type, "gray"))
+        if self._status_revert_id:
+            self.after_cancel(self._status_revert_id)
+            self._status_revert_id = None
         if status_type == "SAVED":
-            self.after(2000, lambda: self.update_status("Active", "ACTIVE"))
+            self._status_revert_id = self.after(2000, lambda: self.update_status("Active", "ACTIVE"))
 
     def _on_add_app_browse(self):
         filepath = filedialog.askopenfilename(title="Select Application", filetypes=[("Executable files", "*.exe")])
@@ -453,8 +805,19 @@ class AppUI(customtkinter.CTk):
             self.lift()
             self.focus_force()
             self.window_hidden = False
+            self._flush_log()
+            self._resume_gradient()
+
+    def _raise_window(self):
+        if self.window_hidden: 
+            self.show_from_tray()
+        else:
+            self.deiconify()
+            self.lift()
+            self.focus_force()
 
     def quit_application(self):
+        self.control.stop()
         self.script.cleanup()
         self.tray_manager.stop()
         self.destroy()
@@ -463,9 +826,19 @@ class AppUI(customtkinter.CTk):
 # ... (paste the rest of your unchanged classes here)
 class SettingsManager:
     def __init__(self):
-        appdata_dir = Path(os.getenv('APPDATA', '.')) / Config.App.FOLDER_NAME
-        appdata_dir.mkdir(parents=True, exist_ok=True)
-        self._path = appdata_dir / Config.App.SETTINGS_FILE
+        self._path = app_data_dir() / Config.App.SETTINGS_FILE
+        self._lock = threading.Lock()
+        self._stamp: Optional[tuple[int, int]] = None
+        self.version = 0
+        # Writes are debounced onto a background thread; _io_lock keeps them in version order.
+        self._write_cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._writer: Optional[threading.Thread] = None
+        self._dirty = False
+        self._write_error: Optional[OSError] = None
+        self.write_count = self.write_errors = self.reload_count = 0
+        self.write_latency = LatencyHistogram(buckets=LatencyHistogram.FAST_BUCKETS)
+        self.corrupt_backup: Optional[Path] = None
         self.settings = {
             'monitored_apps': [
                 'photoshop.exe', 'afterfx.exe', 'premiere.exe', 'illustrator.exe', 
@@ -476,28 +849,119 @@ class SettingsManager:
             'auto_save_interval': 3,
             'smart_backup_enabled': False,
             'smart_backup_interval': 60,
-            'start_with_windows': False
+            'skip_clean_saves': True,
+            'auto_save_mode': 'fixed',
+            'adaptive_min_interval': 3,
+            'adaptive_max_interval': 300,
+            'adaptive_profiles': {},
+            'smart_backup_dedup': True,
+            'backup_keep_within_hours': 24,
+            'backup_keep_hourly': 24,
+            'backup_keep_daily': 7,
+            'backup_keep_weekly': 8,
+            'backup_compression': 'off',
+            'backup_compression_workers': 1,
+            'start_with_windows': False,
+            'journal_compress': True,
+            'footer_animation_fps': Config.UI.FOOTER_ANIMATION_FPS
         }
+    def _file_stamp(self) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(self._path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
     def load(self):
-        if self._path.exists():
-            try:
-                with open(self._path, 'r') as f: 
-                    loaded_settings = json.load(f)
-                for key, value in self.settings.items():
-                    loaded_settings.setdefault(key, value)
-                self.settings = loaded_settings
-            except (json.JSONDecodeError, IOError): 
+        with self._lock:
+            if self._path.exists():
+                try:
+                    with open(self._path, 'r') as f: 
+                        loaded_settings = json.load(f)
+                    if not isinstance(loaded_settings, dict): 
+                        raise ValueError("config.json is not an object")
+                    for key, value in self.settings.items():
+                        loaded_settings.setdefault(key, value)
+                    self.settings = loaded_settings
+                    self.version += 1
+                    self._stamp = self._file_stamp()
+                except (ValueError, UnicodeDecodeError):
+                    # Keep the broken file for inspection instead of silently overwriting it.
+                    self.corrupt_backup = self._quarantine()
+                    self.save()
+                except OSError as e:
+                    print(f"Could not read settings, using defaults: {e}")
+            else:
                 self.save()
-        else:
-            self.save()
-        return self.settings
-    def save(self):
+            return self.settings
+    def _quarantine(self) -> Optional[Path]:
+        target = self._path.with_name(f"{self._path.stem}.corrupt-{datetime.now():%Y%m%d-%H%M%S}{self._path.suffix}")
         try:
-            with open(self._path, 'w') as f: 
-                json.dump(self.settings, f, indent=4)
-            return True
-        except IOError: 
-            return False
+            os.replace(self._path, target)
+            return target
+        except OSError:
+            return None
+    def reload_if_changed(self, force: bool = False):
+        """Re-reads config.json only if its mtime/size changed; the engine's settings_watch job calls it off the UI thread."""
+        if force:
+            self.flush()  # a pending in-memory change is newer than the file, so write it before re-reading
+        elif self._dirty:
+            return self.settings
+        if force or self._file_stamp() != self._stamp:
+            self.reload_count += 1
+            return self.load()
+        return self.settings
+    def snapshot(self) -> tuple[int, dict]:
+        """Returns (version, settings) without touching the disk; safe on the focus hot path."""
+        return self.version, self.settings
+    def save(self) -> bool:
+        """Queues a debounced write; returns False if the previous write failed."""
+        with self._write_cond:
+            self.version += 1
+            self._dirty = True
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="SettingsWriter", daemon=True)
+                self._writer.start()
+            self._write_cond.notify()
+            return self._write_error is None
+    def flush(self) -> bool:
+        """Writes any pending change right away."""
+        self._write()
+        return self._write_error is None
+    def _write_loop(self):
+        while True:
+            with self._write_cond:
+                while not self._dirty: 
+                    self._write_cond.wait()
+                deadline = time.monotonic() + Config.Settings.WRITE_DEBOUNCE
+                while self._dirty and (remaining := deadline - time.monotonic()) > 0:
+                    self._write_cond.wait(remaining)
+            self._write()
+    def _write(self):
+        with self._io_lock:
+            with self._write_cond:
+                if not self._dirty: 
+                    return
+                try: 
+                    text = json.dumps(self.settings, indent=4)
+                except RuntimeError:  # mutated mid-dump by another thread; the writer retries
+                    return
+                self._dirty = False
+            tmp = self._path.with_name(self._path.name + ".tmp")
+            started = time.perf_counter()
+            try:
+                with open(tmp, 'w') as f:
+                    f.write(text)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp, self._path)
+                self._stamp = self._file_stamp()
+                self.write_count += 1
+                self._write_error = None
+                self.write_latency.observe(time.perf_counter() - started)
+            except OSError as e:
+                self._write_error = e
+                self.write_errors += 1
+                print(f"Failed to write settings: {e}")
 
 class WindowsStartupManager:
     def __init__(self):
@@ -531,86 +995,1577 @@ class WindowsStartupManager:
         except Exception as e: 
             print(f"Failed to create shortcut: {e}")
 
-class ProcessMonitor:
-    def __init__(self, log_cb: Callable): 
-        self._log, self.hook, self.hook_proc = log_cb, None, None
-    def get_active_window_info(self) -> Optional[tuple[str, str]]:
-        if not WINDOWS_API_AVAILABLE: 
+class _ScheduledJob:
+    __slots__ = ('name', 'interval', 'callback', 'due', 'periodic', 'cancelled')
+    def __init__(self, name: str, interval: float, callback: Callable, due: float, periodic: bool):
+        self.name, self.interval, self.callback = name, interval, callback
+        self.due, self.periodic, self.cancelled = due, periodic, False
+
+class Scheduler:
+    """Single thread running all named jobs from a timer heap; re-arms from due time so ticks don't drift."""
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._heap: list[tuple[float, int, _ScheduledJob]] = []
+        self._jobs: dict[str, _ScheduledJob] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.lateness = LatencyHistogram(buckets=LatencyHistogram.FAST_BUCKETS)  # due -> started, i.e. timer drift
+        self.runs = self.failures = 0
+    def start(self):
+        with self._cond:
+            if self._running: 
+                return
+            self._running = True
+        self._thread = threading.Thread(target=self._loop, name="Scheduler", daemon=True)
+        self._thread.start()
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+    def schedule(self, name: str, interval: float, callback: Callable, periodic: bool = True, delay: Optional[float] = None):
+        with self._cond:
+            self._cancel_locked(name)
+            due = self._clock() + (interval if delay is None else delay)
+            job = _ScheduledJob(name, interval, callback, due, periodic)
+            self._jobs[name] = job
+            self._push(job)
+            self._cond.notify()
+            return job
+    def reschedule(self, name: str, interval: float) -> bool:
+        with self._cond:
+            job = self._jobs.get(name)
+        if not job: 
+            return False
+        self.schedule(name, interval, job.callback, job.periodic)
+        return True
+    def cancel(self, name: str):
+        with self._cond:
+            self._cancel_locked(name)
+    def is_scheduled(self, name: str) -> bool:
+        return name in self._jobs
+    def _cancel_locked(self, name: str):
+        job = self._jobs.pop(name, None)
+        if job: 
+            job.cancelled = True
+        if len(self._heap) > 2 * len(self._jobs) + 16:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+    def _push(self, job: _ScheduledJob):
+        heapq.heappush(self._heap, (job.due, next(self._seq), job))
+    def run_pending(self) -> Optional[float]:
+        """Runs every job that is due and returns the seconds until the next one (None if idle)."""
+        while True:
+            with self._cond:
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                if not self._heap: 
+                    return None
+                now = self._clock()
+                due, _, job = self._heap[0]
+                if due > now: 
+                    return due - now
+                heapq.heappop(self._heap)
+                if job.periodic and job.interval > 0:
+                    job.due = due + job.interval
+                    if job.due <= now:
+                        job.due = now + job.interval - (now - due) % job.interval
+                    self._push(job)
+                else:
+                    self._jobs.pop(job.name, None)
+            self.lateness.observe(now - due)
+            self.runs += 1
+            try: 
+                job.callback()
+            except Exception as e: 
+                self.failures += 1
+                print(f"Scheduled job '{job.name}' failed: {e}")
+    def _loop(self):
+        while True:
+            self.run_pending()
+            with self._cond:
+                if not self._running: 
+                    return
+                wait = self._heap[0][0] - self._clock() if self._heap else None
+                if wait is not None and wait <= 0: 
+                    continue
+                self._cond.wait(wait)
+
+class FocusBackend:
+    """Source of foreground-window information and change notifications."""
+    name = "base"
+    def foreground(self) -> Optional[tuple[int, str]]:
+        """Returns (pid, window title) of the focused window, or None."""
+        return None
+    def process_name(self, pid: int) -> Optional[str]:
+        """Lets a backend supply the process name itself; None means ask psutil."""
+        return None
+    def start(self, on_change: Callable):
+        raise NotImplementedError
+    def stop(self): 
+        pass
+
+class NullFocusBackend(FocusBackend):
+    """Used when no foreground-window API is available: never reports a window or a change."""
+    name = "none"
+    def start(self, on_change: Callable): 
+        pass
+
+class Win32FocusBackend(FocusBackend):
+    name = "win32-cbt-hook"
+    def __init__(self):
+        self.hook, self.hook_proc = None, None
+    def foreground(self) -> Optional[tuple[int, str]]:
+        hwnd = GetForegroundWindow()
+        if not hwnd: 
             return None
+        _, pid = GetWindowThreadProcessId(hwnd)
+        return (pid, GetWindowText(hwnd))
+    def start(self, on_change: Callable):
+        def handler(nCode, wParam, lParam):
+            if nCode >= 0 and wParam == win32con.HCBT_ACTIVATE: 
+                on_change()
+            return ctypes.windll.user32.CallNextHookEx(self.hook, nCode, wParam, lParam)
+        HOOKPROC = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        self.hook_proc = HOOKPROC(handler)
+        self.hook = ctypes.windll.user32.SetWindowsHookExW(win32con.WH_CBT, self.hook_proc, ctypes.windll.kernel32.GetModuleHandleW(None), 0)
+        if not self.hook: 
+            raise RuntimeError("Hook failed.")
+    def stop(self):
+        if self.hook: 
+            ctypes.windll.user32.UnhookWindowsHookEx(self.hook)
+            self.hook = None
+
+class X11FocusBackend(FocusBackend):
+    """Listens for PropertyNotify on the root window's _NET_ACTIVE_WINDOW (EWMH), no polling."""
+    name = "x11-net-active-window"
+    def __init__(self, display_name: Optional[str] = None):
+        self._display_name = display_name
+        self._query = xdisplay.Display(display_name)
+        self._query_lock = threading.Lock()
+        self._events: Optional["xdisplay.Display"] = None
+        self._atoms = {n: self._query.intern_atom(n) for n in ("_NET_ACTIVE_WINDOW", "_NET_WM_PID", "_NET_WM_NAME", "UTF8_STRING")}
+    def foreground(self) -> Optional[tuple[int, str]]:
+        with self._query_lock:
+            try:
+                root = self._query.screen().root
+                active = root.get_full_property(self._atoms["_NET_ACTIVE_WINDOW"], X.AnyPropertyType)
+                if not active or not active.value or not active.value[0]: 
+                    return None
+                window = self._query.create_resource_object('window', active.value[0])
+                pid_prop = window.get_full_property(self._atoms["_NET_WM_PID"], Xatom.CARDINAL)
+                if not pid_prop or not pid_prop.value: 
+                    return None
+                title_prop = window.get_full_property(self._atoms["_NET_WM_NAME"], self._atoms["UTF8_STRING"]) \
+                    or window.get_full_property(Xatom.WM_NAME, X.AnyPropertyType)
+                title = title_prop.value if title_prop else b""
+                if isinstance(title, bytes): 
+                    title = title.decode('utf-8', 'replace')
+                return (int(pid_prop.value[0]), title)
+            except XError:
+                return None
+    def start(self, on_change: Callable):
+        self._events = xdisplay.Display(self._display_name)
+        root = self._events.screen().root
+        root.change_attributes(event_mask=X.PropertyChangeMask)
+        self._events.flush()
+        active_atom = self._atoms["_NET_ACTIVE_WINDOW"]
+        def loop():
+            events = self._events
+            while self._events is events:
+                try: 
+                    event = events.next_event()
+                except Exception: 
+                    return
+                if event.type == X.PropertyNotify and event.atom == active_atom: 
+                    on_change()
+        threading.Thread(target=loop, name="X11FocusBackend", daemon=True).start()
+    def stop(self):
+        events, self._events = self._events, None
+        if events:
+            try: 
+                events.close()
+            except Exception: 
+                pass
+
+class PollingFocusBackend(FocusBackend):
+    """Last resort: polls another backend's foreground() and reports PID changes."""
+    name = "polling"
+    def __init__(self, source: FocusBackend, interval: float = Config.Monitor.POLL_INTERVAL):
+        self._source, self._interval = source, interval
+        self._stop = threading.Event()
+    def foreground(self) -> Optional[tuple[int, str]]: 
+        return self._source.foreground()
+    def process_name(self, pid: int) -> Optional[str]: 
+        return self._source.process_name(pid)
+    def start(self, on_change: Callable):
+        self._stop.clear()
+        def loop():
+            last_pid = None
+            while not self._stop.is_set():
+                try: 
+                    info = self._source.foreground()
+                except Exception: 
+                    info = None
+                if info and info[0] != last_pid: 
+                    last_pid = info[0]
+                    on_change()
+                self._stop.wait(self._interval)
+        threading.Thread(target=loop, name="PollingFocusBackend", daemon=True).start()
+    def stop(self): 
+        self._stop.set()
+
+class SimulatedFocusBackend(FocusBackend):
+    """Deterministic backend for tests and replays: focus changes only when `focus()` is called."""
+    name = "simulated"
+    def __init__(self):
+        self._current: Optional[tuple[int, str]] = None
+        self._names: dict[int, str] = {}
+        self._on_change: Optional[Callable] = None
+    def focus(self, pid: int, process_name: str, title: str = ""):
+        self._names[pid] = process_name.lower()
+        self._current = (pid, title)
+        if self._on_change: 
+            self._on_change()
+    def clear(self):
+        self._current = None
+        if self._on_change: 
+            self._on_change()
+    def foreground(self) -> Optional[tuple[int, str]]: 
+        return self._current
+    def process_name(self, pid: int) -> Optional[str]: 
+        return self._names.get(pid)
+    def start(self, on_change: Callable): 
+        self._on_change = on_change
+    def stop(self): 
+        self._on_change = None
+
+class InputInjector:
+    """Sends keystrokes to the foreground window; each call goes out as a single batch."""
+    name = "none"
+    def hotkey(self, *keys: str):
+        raise NotImplementedError
+    def type_text(self, text: str):
+        raise NotImplementedError
+    def close(self): 
+        pass
+    @staticmethod
+    def default() -> "InputInjector":
+        if WINDOWS_API_AVAILABLE: 
+            return SendInputInjector()
+        if XLIB_AVAILABLE and os.getenv('DISPLAY'):
+            try: 
+                return XTestInputInjector()
+            except Exception: 
+                pass
+        return PyAutoGUIInjector()
+
+class SendInputInjector(InputInjector):
+    """Win32 SendInput: a whole chord or string is one call into the input queue."""
+    name = "win32-sendinput"
+    KEYEVENTF_KEYUP, KEYEVENTF_UNICODE = 0x2, 0x4
+    VK = {'ctrl': 0x11, 'shift': 0x10, 'alt': 0x12, 'win': 0x5B, 'enter': 0x0D,
+          'tab': 0x09, 'esc': 0x1B, 'backspace': 0x08, 'space': 0x20}
+    def __init__(self):
+        class KEYBDINPUT(ctypes.Structure):
+            _fields_ = [('wVk', wintypes.WORD), ('wScan', wintypes.WORD), ('dwFlags', wintypes.DWORD),
+                        ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+        class MOUSEINPUT(ctypes.Structure):  # only here so the union has the size SendInput expects
+            _fields_ = [('dx', wintypes.LONG), ('dy', wintypes.LONG), ('mouseData', wintypes.DWORD),
+                        ('dwFlags', wintypes.DWORD), ('time', wintypes.DWORD), ('dwExtraInfo', ctypes.c_size_t)]
+        class _UNION(ctypes.Union):
+            _fields_ = [('ki', KEYBDINPUT), ('mi', MOUSEINPUT)]
+        class INPUT(ctypes.Structure):
+            _fields_ = [('type', wintypes.DWORD), ('u', _UNION)]
+        self._KEYBDINPUT, self._INPUT = KEYBDINPUT, INPUT
+        # A private handle loaded with use_last_error, so get_last_error() sees SendInput's error code.
+        self._user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._user32.SendInput.argtypes = (wintypes.UINT, ctypes.POINTER(INPUT), ctypes.c_int)
+        self._user32.SendInput.restype = wintypes.UINT
+    def _key(self, vk: int = 0, scan: int = 0, flags: int = 0):
+        event = self._INPUT(type=1)  # INPUT_KEYBOARD
+        event.u.ki = self._KEYBDINPUT(vk, scan, flags, 0, 0)
+        return event
+    def _send(self, events: list):
+        batch = (self._INPUT * len(events))(*events)
+        if self._user32.SendInput(len(events), batch, ctypes.sizeof(self._INPUT)) != len(events):
+            raise ctypes.WinError(ctypes.get_last_error(), "SendInput was blocked")
+    def _vk(self, key: str) -> int:
+        key = key.lower()
+        if key in self.VK: 
+            return self.VK[key]
+        if len(key) == 1 and key.isalnum(): 
+            return ord(key.upper())
+        raise ValueError(f"Unsupported key: {key}")
+    def hotkey(self, *keys: str):
+        codes = [self._vk(k) for k in keys]
+        self._send([self._key(vk) for vk in codes] + [self._key(vk, flags=self.KEYEVENTF_KEYUP) for vk in reversed(codes)])
+    def type_text(self, text: str):
+        events = []
+        for unit in struct.unpack(f'<{len(text.encode("utf-16-le")) // 2}H', text.encode('utf-16-le')):
+            events += [self._key(scan=unit, flags=self.KEYEVENTF_UNICODE),
+                       self._key(scan=unit, flags=self.KEYEVENTF_UNICODE | self.KEYEVENTF_KEYUP)]
+        if events: 
+            self._send(events)
+
+class XTestInputInjector(InputInjector):
+    """X11 XTEST: queues every fake key event and flushes the batch with one round trip."""
+    name = "x11-xtest"
+    KEYSYMS = {'ctrl': 'Control_L', 'shift': 'Shift_L', 'alt': 'Alt_L', 'win': 'Super_L', 'enter': 'Return',
+               'tab': 'Tab', 'esc': 'Escape', 'backspace': 'BackSpace', 'space': 'space'}
+    def __init__(self, display_name: Optional[str] = None):
+        from Xlib import XK
+        from Xlib.ext import xtest
+        self._XK, self._xtest = XK, xtest
+        self._display = xdisplay.Display(display_name)
+        if not self._display.has_extension('XTEST'): 
+            raise RuntimeError("XTEST extension not available")
+        self._lock = threading.Lock()
+        self._shift = self._keycode(self._keysym('shift'))
+    def _keysym(self, key: str) -> int:
+        name = self.KEYSYMS.get(key.lower(), key)
+        if len(name) > 1: 
+            return self._XK.string_to_keysym(name)
+        return ord(name) if ord(name) < 0x100 else 0x01000000 | ord(name)  # Latin-1 / Unicode keysyms
+    def _keycode(self, keysym: int) -> int:
+        keycode = self._display.keysym_to_keycode(keysym)
+        if not keycode: 
+            raise ValueError(f"No keycode for keysym {keysym:#x}")
+        return keycode
+    def _press(self, keycodes: list[int]):
+        for keycode in keycodes: 
+            self._xtest.fake_input(self._display, X.KeyPress, keycode)
+        for keycode in reversed(keycodes): 
+            self._xtest.fake_input(self._display, X.KeyRelease, keycode)
+    def hotkey(self, *keys: str):
+        codes = [self._keycode(self._keysym(k)) for k in keys]
+        with self._lock:
+            self._press(codes)
+            self._display.sync()
+    def type_text(self, text: str):
+        with self._lock:
+            for char in text:
+                keysym = self._keysym(char)
+                keycode = self._keycode(keysym)
+                # Capitals and most punctuation sit on the key's shifted level.
+                shifted = self._display.keycode_to_keysym(keycode, 0) != keysym
+                self._press([self._shift, keycode] if shifted else [keycode])
+            self._display.sync()
+    def close(self):
+        try: 
+            self._display.close()
+        except Exception: 
+            pass
+
+class PyAutoGUIInjector(InputInjector):
+    """Fallback for platforms without a native backend; skips pyautogui's per-call PAUSE."""
+    name = "pyautogui"
+    def hotkey(self, *keys: str): 
+        _pyautogui().hotkey(*keys, _pause=False)
+    def type_text(self, text: str): 
+        _pyautogui().write(text, interval=0, _pause=False)
+
+class RecordingInputInjector(InputInjector):
+    """Records actions instead of sending them; for tests and replays."""
+    name = "recording"
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.actions: list[tuple[float, str, tuple]] = []
+    def hotkey(self, *keys: str): 
+        self.actions.append((self._clock(), 'hotkey', keys))
+    def type_text(self, text: str): 
+        self.actions.append((self._clock(), 'type', (text,)))
+
+class WindowInfo(NamedTuple):
+    name: str
+    title: str
+    pid: int
+
+class ProcessMonitor:
+    def __init__(self, log_cb: Callable, dispatch: Callable[[int, Callable], object], backend: Optional[FocusBackend] = None): 
+        self._log, self._dispatch = log_cb, dispatch
+        self.backend = backend or self._default_backend()
+        self._name_cache: OrderedDict[int, tuple[psutil.Process, str, int]] = OrderedDict()  # pid -> (process, name, generation validated)
+        self._cache_lock = threading.Lock()
+        self.cache_hits = self.cache_misses = self.cache_evictions = 0
+        # Bumped on every focus event so callers can tell whether focus may have moved since they looked.
+        self.focus_generation = 0
+        self.lookup_latency = LatencyHistogram(buckets=LatencyHistogram.FAST_BUCKETS)
+    def _process_name(self, pid: int) -> str:
+        # Hits are free until the next focus event; then the entry is revalidated once with
+        # is_running(), which compares create times, so a recycled PID misses instead of matching.
+        generation = self.focus_generation
+        with self._cache_lock:
+            cached = self._name_cache.get(pid)
+            if cached and cached[2] == generation:
+                self._name_cache.move_to_end(pid)
+                self.cache_hits += 1
+                return cached[1]
+        if cached and cached[0].is_running():
+            with self._cache_lock:
+                self._name_cache[pid] = (cached[0], cached[1], generation)
+                self._name_cache.move_to_end(pid)
+                self.cache_hits += 1
+            return cached[1]
+        with self._cache_lock:
+            if cached and self._name_cache.pop(pid, None): 
+                self.cache_evictions += 1
+            self.cache_misses += 1
+        proc = psutil.Process(pid)
+        name = proc.name().lower()
+        with self._cache_lock:
+            self._name_cache[pid] = (proc, name, generation)
+            self._name_cache.move_to_end(pid)
+            if len(self._name_cache) > Config.Monitor.NAME_CACHE_SIZE:
+                self._name_cache.popitem(last=False)
+                self.cache_evictions += 1
+        return name
+    @staticmethod
+    def _default_backend() -> FocusBackend:
+        if WINDOWS_API_AVAILABLE: 
+            return Win32FocusBackend()
+        if XLIB_AVAILABLE and os.getenv('DISPLAY'):
+            try: 
+                return X11FocusBackend()
+            except Exception: 
+                pass
+        return NullFocusBackend()
+    def get_active_window_info(self) -> Optional["WindowInfo"]:
+        started = time.perf_counter()
         try:
-            hwnd = GetForegroundWindow()
-            if not hwnd: 
+            info = self.backend.foreground()
+            if not info: 
                 return None
-            _, pid = GetWindowThreadProcessId(hwnd)
-            process_name = psutil.Process(pid).name().lower()
-            window_title = GetWindowText(hwnd)
-            return (process_name, window_title)
+            pid, window_title = info
+            process_name = self.backend.process_name(pid) or self._process_name(pid)
+            return WindowInfo(process_name, window_title, pid)
         except (psutil.Error, AttributeError): 
             return None
+        finally:
+            self.lookup_latency.observe(time.perf_counter() - started)
+    def still_focused(self, pid: int, generation: int) -> bool:
+        """Pre-injection check. Trusts an unchanged generation when the backend reports every focus change."""
+        if generation == self.focus_generation and not isinstance(self.backend, PollingFocusBackend): 
+            return True
+        try: 
+            current = self.backend.foreground()
+        except Exception: 
+            return False
+        return bool(current) and current[0] == pid
     def start_monitoring(self, check_cb: Callable):
-        if not WINDOWS_API_AVAILABLE: 
-            self._log("Windows API not found. Using fallback polling.", LogLevel.WARNING)
-            return self._start_fallback_monitoring(check_cb)
+        # The Win32 hook fires before activation completes, so give the new window a moment.
+        delay = 100 if isinstance(self.backend, Win32FocusBackend) else 0
+        def notify():
+            self.focus_generation += 1
+            self._dispatch(delay, check_cb)
+        if isinstance(self.backend, NullFocusBackend):
+            self._log("No foreground-window API available; monitoring disabled.", LogLevel.WARNING)
+            return
         try:
-            def handler(nCode, wParam, lParam):
-                if nCode >= 0 and wParam == win32con.HCBT_ACTIVATE: 
-                    AppUI.instance.after(100, check_cb)
-                return ctypes.windll.user32.CallNextHookEx(self.hook, nCode, wParam, lParam)
-            HOOKPROC = ctypes.WINFUNCTYPE(ctypes.c_int, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
-            self.hook_proc = HOOKPROC(handler)
-            self.hook = ctypes.windll.user32.SetWindowsHookExW(win32con.WH_CBT, self.hook_proc, ctypes.windll.kernel32.GetModuleHandleW(None), 0)
-            if not self.hook: 
-                raise RuntimeError("Hook failed.")
+            self.backend.start(notify)
             self._log("Real-time monitoring enabled.", LogLevel.SUCCESS)
         except Exception: 
-            self._start_fallback_monitoring(check_cb)
-    def _start_fallback_monitoring(self, check_cb: Callable):
-        def loop():
-            last_info = None
-            while True:
-                info = self.get_active_window_info()
-                if info and info[0] != (last_info and last_info[0]): 
-                    last_info = info
-                    AppUI.instance.after(0, check_cb)
-                time.sleep(2)
-        threading.Thread(target=loop, daemon=True).start()
+            self._log("Event monitoring unavailable. Using fallback polling.", LogLevel.WARNING)
+            self.backend = PollingFocusBackend(self.backend)
+            self.backend.start(notify)
     def cleanup(self):
-        if self.hook and WINDOWS_API_AVAILABLE: 
-            ctypes.windll.user32.UnhookWindowsHookEx(self.hook)
+        self.backend.stop()
+
+class DocumentResolver:
+    """Works out which file a focused window is editing, cached per (pid, window title)."""
+    def __init__(self):
+        self._cache: OrderedDict[tuple[int, str], tuple[Optional[Path], float]] = OrderedDict()  # key -> (path, expires)
+        self._lock = threading.Lock()
+        self.cache_hits = self.cache_misses = 0
+    def resolve(self, info: WindowInfo) -> Optional[Path]:
+        key = (info.pid, info.title.replace('*', '').strip())
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached and cached[1] > now:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return cached[0]
+            self.cache_misses += 1
+        path = self._from_open_files(info.pid, key[1]) or self.path_from_title(info.title)
+        # A miss may just mean the document isn't saved yet, so it is only remembered briefly.
+        expires = float('inf') if path else now + Config.Backup.RESOLVER_MISS_TTL
+        with self._lock:
+            self._cache[key] = (path, expires)
+            self._cache.move_to_end(key)
+            if len(self._cache) > Config.Backup.RESOLVER_CACHE_SIZE: 
+                self._cache.popitem(last=False)
+        return path
+    def forget(self, path: Path):
+        with self._lock:
+            for key in [k for k, v in self._cache.items() if v[0] == path]:
+                del self._cache[key]
+    @staticmethod
+    def _from_open_files(pid: int, title: str) -> Optional[Path]:
+        try: 
+            open_files = psutil.Process(pid).open_files()
+        except (psutil.Error, OSError): 
+            return None
+        title = title.lower()
+        candidates = []
+        for f in open_files:
+            path = Path(f.path)
+            if Config.Backup.FOLDER_NAME in path.parts: 
+                continue
+            try: 
+                mtime = os.stat(path).st_mtime
+            except OSError: 
+                continue
+            candidates.append(((path.stem.lower() in title, path.suffix.lower() in Config.Backup.DOCUMENT_EXTENSIONS, mtime), path))
+        candidates = [c for c in candidates if c[0][0] or c[0][1]]
+        return max(candidates, key=lambda c: c[0])[1] if candidates else None
+    @staticmethod
+    def path_from_title(title: str) -> Optional[Path]:
+        if not title: 
+            return None
+        path = Path(title.split(' @')[0].split(' - ')[0].replace('*', '').strip())
+        return path if path.is_file() else None
+
+class SaveTracker:
+    """Decides whether an auto-save tick needs to send Ctrl+S and counts what the saves did."""
+    def __init__(self, resolver: DocumentResolver):
+        self._resolver = resolver
+        self._marker_apps: set[str] = set()
+        self._pending: Optional[tuple[Path, tuple[int, int]]] = None
+        self._candidate: Optional[tuple[Path, tuple[int, int]]] = None
+        self._backoff = self._skip_remaining = 0
+        self.saves_sent = self.saves_skipped = self.noop_saves = self.bytes_written = 0
+    @staticmethod
+    def _fingerprint(path: Path) -> Optional[tuple[int, int]]:
+        try:
+            st = os.stat(path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+    def should_save(self, info: Optional[WindowInfo]) -> bool:
+        """Decides whether this tick sends Ctrl+S; nothing is recorded until record_sent()."""
+        self._candidate = None
+        if not info: 
+            return True
+        path = self._resolver.resolve(info)
+        fingerprint = self._fingerprint(path) if path else None
+        if self._pending and self._pending[0] == path:
+            if fingerprint == self._pending[1]:
+                self.noop_saves += 1
+                self._backoff = min(max(self._backoff * 2, 1), Config.Save.MAX_NOOP_BACKOFF)
+            else:
+                self.bytes_written += fingerprint[1] if fingerprint else 0
+                self._backoff = 0
+        self._pending = None
+        if '*' in info.title:
+            self._marker_apps.add(info.name)
+            dirty = True
+        elif info.name in self._marker_apps:
+            dirty = False
+        elif self._skip_remaining > 0:
+            self._skip_remaining -= 1
+            dirty = False
+        else:
+            dirty = True
+        if not dirty:
+            self.saves_skipped += 1
+            return False
+        if path and fingerprint: 
+            self._candidate = (path, fingerprint)
+        return True
+    def record_sent(self):
+        """Call once the keystroke went out; a save cancelled or failed after should_save() leaves no trace."""
+        self._pending, self._candidate = self._candidate, None
+        self._skip_remaining = self._backoff
+        self.saves_sent += 1
+    def reset(self):
+        self._pending = self._candidate = None
+        self._backoff = self._skip_remaining = 0
+
+def input_idle_seconds() -> Optional[float]:
+    """Seconds since the last keyboard/mouse input, or None where the platform can't tell us."""
+    if not WINDOWS_API_AVAILABLE: 
+        return None
+    class LASTINPUTINFO(ctypes.Structure):
+        _fields_ = [('cbSize', ctypes.c_uint), ('dwTime', ctypes.c_uint)]
+    info = LASTINPUTINFO(ctypes.sizeof(LASTINPUTINFO), 0)
+    if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)): 
+        return None
+    return ((ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF) / 1000
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (seconds), optionally over a rolling window of recent samples."""
+    BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+    FAST_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+    def __init__(self, window: Optional[int] = None, buckets: tuple = BUCKETS):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._recent: Optional[deque] = deque() if window else None
+        self._window = window
+        self._lock = threading.Lock()
+        self.count, self.sum = 0, 0.0
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if self._recent is not None:
+                if len(self._recent) >= self._window:
+                    old_index, old_value = self._recent.popleft()
+                    self._counts[old_index] -= 1
+                    self.sum -= old_value
+                    self.count -= 1
+                self._recent.append((index, value))
+            self._counts[index] += 1
+            self.count += 1
+            self.sum += value
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (inf for the overflow bucket)."""
+        with self._lock:
+            if not self.count: 
+                return None
+            target, seen = q * self.count, 0
+            for index, count in enumerate(self._counts):
+                seen += count
+                if seen >= target: 
+                    return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, running = {}, 0
+            for bound, count in zip(self.buckets + (float('inf'),), self._counts):
+                running += count
+                cumulative["+Inf" if bound == float('inf') else str(bound)] = running
+            count, total = self.count, self.sum
+        quantiles = {f"p{int(q * 100)}": self.quantile(q) for q in (0.5, 0.95, 0.99)}
+        return dict({'buckets': cumulative, 'count': count, 'sum': round(total, 6)},
+                    **{k: "+Inf" if v == float('inf') else v for k, v in quantiles.items()})
+
+class MetricsRegistry:
+    """Names the engine's counters, gauges and histograms for export; sources are read only at export time."""
+    def __init__(self, prefix: str = Config.Metrics.PREFIX):
+        self._prefix = prefix
+        self._metrics: list[tuple[str, str, str, object]] = []  # (kind, name, help, source)
+    def counter(self, name: str, help_text: str, source: Callable[[], float]):
+        self._metrics.append(('counter', name, help_text, source))
+    def gauge(self, name: str, help_text: str, source: Callable[[], float]):
+        self._metrics.append(('gauge', name, help_text, source))
+    def histogram(self, name: str, help_text: str, source: LatencyHistogram):
+        self._metrics.append(('histogram', name, help_text, source))
+    def collect(self) -> dict:
+        values = {}
+        for kind, name, _, source in self._metrics:
+            try: 
+                value = source.snapshot() if kind == 'histogram' else source()
+            except Exception: 
+                continue
+            values[name] = "+Inf" if value == float('inf') else value
+        return values
+    def prometheus(self, values: Optional[dict] = None) -> str:
+        values = self.collect() if values is None else values
+        lines = []
+        for kind, name, help_text, _ in self._metrics:
+            if values.get(name) is None: 
+                continue
+            full = self._prefix + name
+            lines += [f"# HELP {full} {help_text}", f"# TYPE {full} {kind}"]
+            if kind == 'histogram':
+                snapshot = values[name]
+                lines += [f'{full}_bucket{{le="{le}"}} {count}' for le, count in snapshot['buckets'].items()]
+                lines += [f"{full}_sum {snapshot['sum']}", f"{full}_count {snapshot['count']}"]
+            else:
+                lines.append(f"{full} {values[name]}")
+        return "\n".join(lines) + "\n"
+    def export(self, directory: Path):
+        """Writes a Prometheus textfile (node_exporter textfile collector format) and a JSON snapshot."""
+        values = self.collect()
+        payloads = {Config.Metrics.PROM_FILE: self.prometheus(values),
+                    Config.Metrics.JSON_FILE: json.dumps(dict(values, timestamp=time.time()), indent=2)}
+        for filename, text in payloads.items():
+            path = directory / filename
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.write_text(text)
+            os.replace(tmp, path)
+
+class _Inotify:
+    """Minimal ctypes binding for Linux inotify: watches directories for finished writes."""
+    IN_CLOSE_WRITE, IN_MOVED_TO = 0x8, 0x80
+    MAX_WATCHES = 16
+    _EVENT = struct.Struct('iIII')
+    @classmethod
+    def create(cls) -> Optional["_Inotify"]:
+        if not sys.platform.startswith('linux'): 
+            return None
+        try: 
+            return cls()
+        except (OSError, AttributeError): 
+            return None
+    def __init__(self):
+        import ctypes, ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0: 
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: OrderedDict[Path, int] = OrderedDict()
+        self._wds: dict[int, Path] = {}
+        self._lock = threading.Lock()
+    def watch(self, directory: Path):
+        with self._lock:
+            if directory in self._dirs:
+                self._dirs.move_to_end(directory)
+                return
+            wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self.IN_CLOSE_WRITE | self.IN_MOVED_TO)
+            if wd < 0: 
+                raise OSError(self._ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[directory], self._wds[wd] = wd, directory
+            if len(self._dirs) > self.MAX_WATCHES:
+                _, old_wd = self._dirs.popitem(last=False)
+                self._wds.pop(old_wd, None)
+                self._libc.inotify_rm_watch(self.fd, old_wd)
+    def read(self, timeout: float) -> list[Path]:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready: 
+            return []
+        try: 
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError: 
+            return []
+        paths, offset = [], 0
+        while offset + self._EVENT.size <= len(data):
+            wd, _, _, length = self._EVENT.unpack_from(data, offset)
+            offset += self._EVENT.size
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            with self._lock:
+                directory = self._wds.get(wd)
+            if directory and name: 
+                paths.append(directory / os.fsdecode(name))
+        return paths
+    def close(self):
+        os.close(self.fd)
+
+class SaveWatcher:
+    """Confirms that each Ctrl+S reached the disk and measures keystroke-to-close latency."""
+    def __init__(self, scheduler: Scheduler, on_confirmed: Callable[[str, Path, float], None], on_missed: Callable[[str, Path], None]):
+        self._scheduler, self._on_confirmed, self._on_missed = scheduler, on_confirmed, on_missed
+        self._lock = threading.Lock()
+        self._pending: dict[Path, list] = {}  # path -> [app, first keystroke, latest keystroke, known dirty]
+        self._inotify = _Inotify.create()
+        self._stopped = threading.Event()
+        if self._inotify:
+            threading.Thread(target=self._inotify_loop, name="SaveWatcher", daemon=True).start()
+    def expect(self, app: str, path: Path, known_dirty: bool = True):
+        """Call right before sending the keystroke. Without `known_dirty` (no '*' in the title) the save may
+        legitimately leave the file alone, so a timeout is dropped as a no-op instead of reported as missed."""
+        started = time.monotonic()
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry:
+                # Another save into a still-unconfirmed file: latency counts from the newest keystroke,
+                # the timeout from the oldest, so a file that never gets written is still reported.
+                entry[0], entry[2], entry[3] = app, started, entry[3] or known_dirty
+                return
+            self._pending[path] = [app, started, started, known_dirty]
+        use_polling = self._inotify is None
+        if not use_polling:
+            try: 
+                self._inotify.watch(path.parent)
+            except OSError: 
+                use_polling = True
+        if use_polling:
+            self._start_polling(path)
+        self._scheduler.schedule(f'save_verify_timeout:{path}', Config.Save.VERIFY_TIMEOUT, lambda: self._timed_out(path), periodic=False)
+    def _start_polling(self, path: Path):
+        state = {'last': SaveTracker._fingerprint(path), 'changed_at': None, 'stable': 0}
+        def poll():
+            fingerprint = SaveTracker._fingerprint(path)
+            if fingerprint != state['last']:
+                state['last'], state['changed_at'], state['stable'] = fingerprint, time.monotonic(), 0
+            elif state['changed_at'] is not None:
+                state['stable'] += 1
+                if state['stable'] >= Config.Save.VERIFY_SETTLE_POLLS:
+                    self._confirm(path, state['changed_at'])
+        self._scheduler.schedule(f'save_verify_poll:{path}', Config.Save.VERIFY_POLL_INTERVAL, poll)
+    def _inotify_loop(self):
+        while not self._stopped.is_set():
+            try: 
+                paths = self._inotify.read(1.0)
+            except (OSError, ValueError): 
+                return
+            now = time.monotonic()
+            for path in paths:
+                self._confirm(path, now)
+    def _forget(self, path: Path) -> Optional[list]:
+        with self._lock:
+            entry = self._pending.pop(path, None)
+        if entry:
+            self._scheduler.cancel(f'save_verify_poll:{path}')
+            self._scheduler.cancel(f'save_verify_timeout:{path}')
+        return entry
+    def _confirm(self, path: Path, when: float):
+        entry = self._forget(path)
+        if entry:
+            app, first, latest, _ = entry
+            self._on_confirmed(app, path, when - (latest if when >= latest else first))
+    def _timed_out(self, path: Path):
+        entry = self._forget(path)
+        if entry and entry[3]: 
+            self._on_missed(entry[0], path)
+    def discard(self, path: Path):
+        """Drops the expectation for `path`, e.g. when its keystroke could not be sent."""
+        self._forget(path)
+    def cancel(self):
+        for path in list(self._pending):
+            self._forget(path)
+    def stop(self):
+        self.cancel()
+        self._stopped.set()
+        if self._inotify: 
+            self._inotify.close()
+
+class AdaptiveInterval:
+    """Per-app auto-save interval that follows measured save cost and user activity."""
+    def __init__(self, settings_cb: Callable[[], dict]):
+        self._settings = settings_cb
+        self._current: dict[str, float] = {}
+        self.profiles_changed = False
+    def _bounds(self) -> tuple[float, float]:
+        settings = self._settings()
+        low = max(1.0, float(settings.get('adaptive_min_interval', 3)))
+        return low, max(low, float(settings.get('adaptive_max_interval', 300)))
+    def _base(self, app: str) -> float:
+        low, high = self._bounds()
+        profile = self._settings().setdefault('adaptive_profiles', {}).get(app)
+        if not profile: 
+            return min(max(float(self._settings().get('auto_save_interval', 3)), low), high)
+        return min(max(profile['save_cost'] * Config.Save.COST_FACTOR, low), high)
+    def initial(self, app: str) -> float:
+        self._current[app] = self._base(app)
+        return self._current[app]
+    def record_cost(self, app: str, seconds: float):
+        profiles = self._settings().setdefault('adaptive_profiles', {})
+        profile = profiles.setdefault(app, {'save_cost': seconds, 'samples': 0})
+        alpha = Config.Save.COST_EWMA_ALPHA
+        profile['save_cost'] = round(seconds if not profile['samples'] else (1 - alpha) * profile['save_cost'] + alpha * seconds, 3)
+        profile['samples'] += 1
+        self.profiles_changed = True
+    def next(self, app: str, dirty: bool, idle: Optional[float]) -> float:
+        low, high = self._bounds()
+        base, current = self._base(app), self._current.get(app) or self._base(app)
+        if idle is not None and idle >= Config.Save.IDLE_THRESHOLD: 
+            interval = high
+        elif dirty: 
+            interval = base
+        else: 
+            interval = current * Config.Save.STRETCH_FACTOR
+        self._current[app] = min(max(interval, low, base if dirty else low), high)
+        return self._current[app]
+
+class WatchlistMatcher:
+    """Compiled `monitored_apps`: a set of exact names plus one regex for name and `title:` globs."""
+    TITLE_PREFIX = "title:"
+    def __init__(self, entries: list[str]):
+        self.exact: set[str] = set()
+        name_rules, title_rules = [], []
+        for entry in entries:
+            entry = entry.strip().lower()
+            if entry.startswith(self.TITLE_PREFIX):
+                pattern = entry[len(self.TITLE_PREFIX):].strip()
+                if pattern:  # a bare "title:" would match every window without a title
+                    title_rules.append(self._glob_to_regex(pattern))
+            elif '*' in entry or '?' in entry:
+                name_rules.append(self._glob_to_regex(entry))
+            elif entry:
+                self.exact.add(entry)
+        branches = []
+        if name_rules: 
+            branches.append(f"(?:{'|'.join(name_rules)})\\x00.*")
+        if title_rules: 
+            branches.append(f"[^\\x00]*\\x00(?:{'|'.join(title_rules)})")
+        self._rules = re.compile('|'.join(branches), re.IGNORECASE | re.DOTALL) if branches else None
+    @staticmethod
+    def _glob_to_regex(pattern: str) -> str:
+        return ''.join('[^\\x00]*' if c == '*' else '[^\\x00]' if c == '?' else re.escape(c) for c in pattern)
+    def matches(self, name: str, title: str = "") -> bool:
+        if name in self.exact: 
+            return True
+        return bool(self._rules and self._rules.fullmatch(f"{name}\x00{title or ''}"))
+
+def copy_file(src: Path, dst: Path):
+    """Copies src to dst, letting the kernel move the data (copy_file_range/sendfile) where it can."""
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        in_fd, out_fd = fsrc.fileno(), fdst.fileno()
+        for method in ('copy_file_range', 'sendfile'):
+            if not hasattr(os, method): 
+                continue
+            offset = 0
+            try:
+                while True:
+                    if method == 'sendfile': 
+                        copied = os.sendfile(out_fd, in_fd, offset, Config.Backup.COPY_CHUNK)
+                    else: 
+                        copied = os.copy_file_range(in_fd, out_fd, Config.Backup.COPY_CHUNK, offset, offset)
+                    if not copied: 
+                        break
+                    offset += copied
+                break
+            except OSError:
+                if offset: 
+                    raise
+        else:
+            shutil.copyfileobj(fsrc, fdst, Config.Backup.COPY_CHUNK)
+    shutil.copystat(src, dst)
+
+def content_defined_chunks(stream: BinaryIO, min_size: int = Config.Backup.CHUNK_MIN,
+                           avg_size: int = Config.Backup.CHUNK_AVG, max_size: int = Config.Backup.CHUNK_MAX) -> Iterator[bytes]:
+    """Yields chunks whose boundaries depend on content, not offsets, so an edit only changes nearby chunks."""
+    mask = (1 << max(((avg_size - min_size) // 256).bit_length() - 1, 0)) - 1
+    anchor, window = Config.Backup.CHUNK_ANCHOR, Config.Backup.CHUNK_WINDOW
+    buffer, eof = bytearray(), False
+    while buffer or not eof:
+        while not eof and len(buffer) < max_size:
+            block = stream.read(Config.Backup.READ_BLOCK)
+            if not block: 
+                eof = True
+            buffer += block
+        if len(buffer) <= min_size:
+            if buffer: 
+                yield bytes(buffer)
+            return
+        cut, probes = min(len(buffer), max_size), 0
+        with memoryview(buffer) as view:
+            pos = buffer.find(anchor, min_size, cut)
+            while pos != -1 and probes < Config.Backup.CHUNK_MAX_PROBES:
+                if not zlib.crc32(view[pos - window:pos + 1]) & mask:
+                    cut = pos + 1
+                    break
+                probes += 1
+                pos = buffer.find(anchor, pos + 1, cut)
+        yield bytes(buffer[:cut])
+        del buffer[:cut]
+
+def _lower_worker_priority():
+    try: 
+        psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if os.name == 'nt' else 10)
+    except (psutil.Error, AttributeError, OSError): 
+        pass
+
+def _open_compressed(path: Path, mode: str, codec: str, level: Optional[int] = None):
+    if codec == 'zstd':
+        import zstandard
+        raw = open(path, mode)
+        if 'w' in mode:
+            return zstandard.ZstdCompressor(level=level or Config.Backup.COMPRESSION_LEVELS['zstd']).stream_writer(raw, closefd=True)
+        return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+    return lzma.open(path, mode, preset=level) if 'w' in mode else lzma.open(path, mode)
+
+def decompress_file_bytes(path: Path) -> bytes:
+    for codec, suffix in Config.Backup.COMPRESSION_SUFFIXES.items():
+        if path.name.endswith(suffix):
+            with _open_compressed(path, 'rb', codec) as f: 
+                return f.read()
+    return path.read_bytes()
+
+def compress_backup_files(paths: list[str], codec: str) -> list[tuple[str, str, int, int, float]]:
+    """Runs in the compression pool; returns (original, compressed, bytes in, bytes out, seconds) per file."""
+    import importlib.util
+    if codec == 'zstd' and importlib.util.find_spec("zstandard") is None: 
+        codec = 'lzma'
+    suffix, level = Config.Backup.COMPRESSION_SUFFIXES[codec], Config.Backup.COMPRESSION_LEVELS[codec]
+    results = []
+    for name in paths:
+        src = Path(name)
+        dst = src.with_name(src.name + suffix)
+        tmp = dst.with_name(dst.name + ".partial")
+        start = time.perf_counter()
+        try:
+            with open(src, 'rb') as fin, _open_compressed(tmp, 'wb', codec, level) as fout:
+                shutil.copyfileobj(fin, fout, Config.Backup.READ_BLOCK)
+            in_size, out_size = os.path.getsize(src), os.path.getsize(tmp)
+            os.replace(tmp, dst)
+            src.unlink()
+        except FileNotFoundError:
+            tmp.unlink(missing_ok=True)
+            continue
+        results.append((str(src), str(dst), in_size, out_size, time.perf_counter() - start))
+    return results
+
+class BackupStore:
+    """Deduplicating Smart Backup store: unique chunks under their BLAKE2b hash, one JSON manifest per backup."""
+    def __init__(self, backup_dir: Path):
+        self.backup_dir = backup_dir
+        self.chunk_dir = backup_dir / Config.Backup.STORE_DIR
+        self.written: list[Path] = []
+    def chunk_path(self, digest: str) -> Path:
+        return self.chunk_dir / digest[:2] / digest
+    def chunk_paths(self, digest: str) -> list[Path]:
+        """The raw chunk path followed by its possible compressed variants."""
+        raw = self.chunk_path(digest)
+        return [raw] + [raw.with_name(raw.name + suffix) for suffix in Config.Backup.COMPRESSION_SUFFIXES.values()]
+    def has_chunk(self, digest: str) -> bool:
+        return any(path.exists() for path in self.chunk_paths(digest))
+    def read_chunk(self, digest: str) -> bytes:
+        for path in self.chunk_paths(digest):
+            if path.exists(): 
+                return decompress_file_bytes(path)
+        raise FileNotFoundError(f"Missing backup chunk {digest}")
+    def add(self, original_path: Path, manifest_path: Path, previous: Optional[dict] = None) -> dict:
+        """Stores original_path and writes its manifest; `previous` lets an unchanged file skip hashing."""
+        st = os.stat(original_path)
+        self.written = []
+        if previous and (previous['size'], previous['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+            manifest = dict(previous, created=time.time(), new_bytes=0)
+        else:
+            file_hash, chunks, new_bytes = hashlib.blake2b(), [], 0
+            with open(original_path, 'rb') as f:
+                for chunk in content_defined_chunks(f):
+                    digest = hashlib.blake2b(chunk, digest_size=32).hexdigest()
+                    file_hash.update(chunk)
+                    chunks.append([digest, len(chunk)])
+                    if not self.has_chunk(digest):
+                        path = self.chunk_path(digest)
+                        path.parent.mkdir(parents=True, exist_ok=True)
+                        tmp = path.with_name(path.name + ".partial")
+                        tmp.write_bytes(chunk)
+                        os.replace(tmp, path)
+                        self.written.append(path)
+                        new_bytes += len(chunk)
+            manifest = {
+                'source': str(original_path), 'size': sum(size for _, size in chunks),
+                'mtime_ns': st.st_mtime_ns, 'hash': file_hash.hexdigest(),
+                'created': time.time(), 'chunks': chunks, 'new_bytes': new_bytes
+            }
+        tmp = manifest_path.with_name(manifest_path.name + ".partial")
+        tmp.write_text(json.dumps(manifest))
+        os.replace(tmp, manifest_path)
+        return manifest
+    def restore(self, manifest_path: Path, destination: Path) -> Path:
+        """Rebuilds the file a manifest describes; nothing is left at `destination` if a chunk is missing or corrupt."""
+        manifest = json.loads(Path(manifest_path).read_text())
+        tmp = destination.with_name(destination.name + ".partial")
+        try:
+            with open(tmp, 'wb') as out:
+                for digest, size in manifest['chunks']:
+                    data = self.read_chunk(digest)
+                    if len(data) != size or hashlib.blake2b(data, digest_size=32).hexdigest() != digest:
+                        raise IOError(f"Corrupt backup chunk {digest}")
+                    out.write(data)
+            os.replace(tmp, destination)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return destination
+
+def run_restore(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="app.py restore", description="Rebuild a deduplicated Smart Backup into a normal file.")
+    parser.add_argument('manifest', type=Path, help=f"a *{Config.Backup.MANIFEST_SUFFIX} file in a {Config.Backup.FOLDER_NAME} folder")
+    parser.add_argument('destination', type=Path, nargs='?', help="output file; defaults to the backup's name next to the manifest")
+    parser.add_argument('--force', action='store_true', help="overwrite an existing destination")
+    opts = parser.parse_args(argv)
+    manifest = opts.manifest
+    if not manifest.name.endswith(Config.Backup.MANIFEST_SUFFIX):
+        parser.error(f"not a Smart Backup manifest: {manifest}")
+    destination = opts.destination or manifest.with_name(manifest.name[:-len(Config.Backup.MANIFEST_SUFFIX)])
+    if destination.is_dir(): 
+        destination = destination / manifest.name[:-len(Config.Backup.MANIFEST_SUFFIX)]
+    if destination.exists() and not opts.force:
+        print(f"{destination} already exists; pass --force to overwrite it.", file=sys.stderr)
+        return 1
+    try: 
+        BackupStore(manifest.parent).restore(manifest, destination)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Restore failed: {e}", file=sys.stderr)
+        return 1
+    print(destination)
+    return 0
+
+class BackupCatalog:
+    """SQLite index of every Smart Backup (source, path, time, size, hash) plus the chunks each one uses."""
+    def __init__(self, path: Path):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        with self._db:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS backups (
+                    id INTEGER PRIMARY KEY, source TEXT NOT NULL, path TEXT NOT NULL UNIQUE,
+                    created REAL NOT NULL, size INTEGER NOT NULL, hash TEXT, kind TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS idx_backups_source_created ON backups(source, created);
+                CREATE INDEX IF NOT EXISTS idx_backups_size ON backups(size);
+                CREATE TABLE IF NOT EXISTS chunk_refs (backup_id INTEGER NOT NULL, store TEXT NOT NULL, hash TEXT NOT NULL);
+                CREATE INDEX IF NOT EXISTS idx_chunk_refs_backup ON chunk_refs(backup_id);
+                CREATE INDEX IF NOT EXISTS idx_chunk_refs_hash ON chunk_refs(store, hash);
+            """)
+    def record(self, source: str, path: Path, created: float, size: int, file_hash: Optional[str],
+               kind: str, chunks: Optional[list] = None) -> int:
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT OR REPLACE INTO backups (source, path, created, size, hash, kind) VALUES (?, ?, ?, ?, ?, ?)",
+                (source, str(path), created, size, file_hash, kind))
+            backup_id = cursor.lastrowid
+            if chunks:
+                store = str(Path(path).parent)
+                self._db.executemany("INSERT INTO chunk_refs (backup_id, store, hash) VALUES (?, ?, ?)",
+                                     ((backup_id, store, digest) for digest in {digest for digest, _ in chunks}))
+            return backup_id
+    def rename(self, old_path: str, new_path: str):
+        with self._lock, self._db:
+            self._db.execute("UPDATE backups SET path = ? WHERE path = ?", (new_path, old_path))
+    def latest(self, source: str) -> Optional[dict]:
+        rows = self._query("SELECT * FROM backups WHERE source = ? ORDER BY created DESC LIMIT 1", (source,))
+        return rows[0] if rows else None
+    def for_source(self, source: str) -> list[dict]:
+        return self._query("SELECT * FROM backups WHERE source = ? ORDER BY created DESC", (source,))
+    def larger_than(self, size: int) -> list[dict]:
+        return self._query("SELECT * FROM backups WHERE size > ? ORDER BY size DESC", (size,))
+    def remove(self, backup_ids: list[int]) -> list[tuple[str, str]]:
+        """Deletes the rows and returns (store, hash) for chunks no remaining backup references."""
+        with self._lock, self._db:
+            marks = ",".join("?" * len(backup_ids))
+            refs = self._db.execute(f"SELECT DISTINCT store, hash FROM chunk_refs WHERE backup_id IN ({marks})", backup_ids).fetchall()
+            self._db.execute(f"DELETE FROM chunk_refs WHERE backup_id IN ({marks})", backup_ids)
+            self._db.execute(f"DELETE FROM backups WHERE id IN ({marks})", backup_ids)
+            return [(store, digest) for store, digest in refs
+                    if not self._db.execute("SELECT 1 FROM chunk_refs WHERE store = ? AND hash = ? LIMIT 1", (store, digest)).fetchone()]
+    def _query(self, sql: str, params: tuple) -> list[dict]:
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+def gfs_expired(backups: list[dict], keep_hourly: int, keep_daily: int, keep_weekly: int,
+                keep_within_hours: float = 0, now: Optional[float] = None) -> list[dict]:
+    """Returns the backups that GFS retention (newest per hour/day/ISO week, plus the keep-within window) drops."""
+    ordered = sorted(backups, key=lambda b: b['created'], reverse=True)
+    cutoff = (time.time() if now is None else now) - keep_within_hours * 3600
+    keep = {id(b) for b in ordered if b['created'] >= cutoff}
+    if ordered: 
+        keep.add(id(ordered[0]))
+    periods = (
+        (keep_hourly, lambda d: (d.year, d.month, d.day, d.hour)),
+        (keep_daily, lambda d: (d.year, d.month, d.day)),
+        (keep_weekly, lambda d: d.isocalendar()[:2]),
+    )
+    for count, bucket_of in periods:
+        buckets = set()
+        for backup in ordered:
+            if len(buckets) >= count: 
+                break
+            bucket = bucket_of(datetime.fromtimestamp(backup['created']))
+            if bucket not in buckets:
+                buckets.add(bucket)
+                keep.add(id(backup))
+    return [b for b in ordered if id(b) not in keep]
+
+class BackupEngine:
+    """Backs up the last saved version of a document into its Smart Backup folder on a worker thread."""
+    def __init__(self, log_cb: Callable, status_cb: Callable, settings_cb: Callable[[], dict]):
+        self._log, self._update_status, self._settings = log_cb, status_cb, settings_cb
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="SmartBackup")
+        self.catalog = BackupCatalog(app_data_dir() / Config.Backup.CATALOG_FILE)
+        self._last_manifest: dict[str, dict] = {}
+        self._compressor: Optional[ProcessPoolExecutor] = None
+        self._compressor_workers = 0
+        self.compression_stats: dict[str, list] = {}  # extension -> [bytes in, bytes out, seconds]
+        self.duration = LatencyHistogram()
+        self.completed = self.failed = 0
+    def submit(self, original_path: Path) -> Future:
+        return self._executor.submit(self._run, original_path)
+    def _run(self, original_path: Path) -> Optional[Path]:
+        started = time.perf_counter()
+        try:
+            backup_path = self.backup(original_path)
+        except Exception: 
+            self.failed += 1
+            self._log("Backup failed unexpectedly.", LogLevel.ERROR)
+            return None
+        self.duration.observe(time.perf_counter() - started)
+        self.completed += 1
+        self._log(f"Smart Backup created: {backup_path.name}", LogLevel.SUCCESS)
+        self._update_status("Backup!", "SAVED")
+        try:
+            self.prune(str(original_path))
+        except Exception:
+            self._log("Backup pruning failed.", LogLevel.WARNING)
+        return backup_path
+    def backup(self, original_path: Path) -> Path:
+        backup_dir = original_path.parent / Config.Backup.FOLDER_NAME
+        backup_dir.mkdir(exist_ok=True)
+        timestamp = time.strftime("%Y%m%d-%H%M%S")
+        backup_path = backup_dir / f"{original_path.stem}-{timestamp}{original_path.suffix}"
+        for n in itertools.count(1):
+            if not backup_path.exists() and not backup_path.with_name(backup_path.name + Config.Backup.MANIFEST_SUFFIX).exists(): 
+                break
+            backup_path = backup_dir / f"{original_path.stem}-{timestamp}-{n}{original_path.suffix}"
+        source = str(original_path)
+        if self._settings().get('smart_backup_dedup', True):
+            manifest_path = backup_path.with_name(backup_path.name + Config.Backup.MANIFEST_SUFFIX)
+            store = BackupStore(backup_dir)
+            manifest = store.add(original_path, manifest_path, self._previous_manifest(source))
+            self._last_manifest[source] = manifest
+            self.catalog.record(source, manifest_path, manifest['created'], manifest['size'], manifest['hash'],
+                                'manifest', manifest['chunks'])
+            self._compress(store.written, original_path.suffix)
+            return manifest_path
+        partial_path = backup_path.with_name(backup_path.name + ".partial")
+        try:
+            for _ in range(Config.Backup.COPY_RETRIES + 1):
+                before = os.stat(original_path)
+                copy_file(original_path, partial_path)
+                after = os.stat(original_path)
+                if (before.st_mtime_ns, before.st_size) == (after.st_mtime_ns, after.st_size): 
+                    break
+            os.replace(partial_path, backup_path)
+        except BaseException:
+            partial_path.unlink(missing_ok=True)
+            raise
+        self.catalog.record(source, backup_path, time.time(), after.st_size, None, 'copy')
+        self._compress([backup_path], original_path.suffix)
+        return backup_path
+    def _compress(self, paths: list[Path], extension: str):
+        settings = self._settings()
+        codec = settings.get('backup_compression', 'off')
+        if not paths or codec not in Config.Backup.COMPRESSION_SUFFIXES: 
+            return
+        workers = max(1, int(settings.get('backup_compression_workers', 1)))
+        if self._compressor is None or workers != self._compressor_workers:
+            if self._compressor: 
+                self._compressor.shutdown(wait=False)
+            self._compressor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                                   initializer=_lower_worker_priority)
+            self._compressor_workers = workers
+        future = self._compressor.submit(compress_backup_files, [str(p) for p in paths], codec)
+        future.add_done_callback(lambda f: self._on_compressed(f, extension.lower() or "(none)"))
+    def _on_compressed(self, future: Future, extension: str):
+        try: 
+            results = future.result()
+        except Exception: 
+            self._log("Backup compression failed.", LogLevel.WARNING)
+            return
+        for original, compressed, _, _, _ in results:
+            self.catalog.rename(original, compressed)
+        stats = self.compression_stats.setdefault(extension, [0, 0, 0.0])
+        for _, _, in_size, out_size, seconds in results:
+            stats[0] += in_size
+            stats[1] += out_size
+            stats[2] += seconds
+        if results:
+            in_size, out_size = sum(r[2] for r in results), sum(r[3] for r in results)
+            self._log(f"Compressed {extension} backup to {out_size / max(in_size, 1):.1%} of its size", LogLevel.INFO)
+    def compression_report(self) -> dict[str, dict]:
+        """Per-extension compression ratio and throughput (MB/s) over this session."""
+        return {ext: {'ratio': out / max(inp, 1), 'throughput_mb_s': inp / max(sec, 1e-9) / 1e6}
+                for ext, (inp, out, sec) in self.compression_stats.items()}
+    def _previous_manifest(self, source: str) -> Optional[dict]:
+        if source in self._last_manifest: 
+            return self._last_manifest[source]
+        latest = self.catalog.latest(source)
+        if latest and latest['kind'] == 'manifest':
+            try: 
+                return json.loads(Path(latest['path']).read_text())
+            except (OSError, ValueError): 
+                return None
+        return None
+    def prune(self, source: str):
+        settings = self._settings()
+        expired = gfs_expired(self.catalog.for_source(source), settings.get('backup_keep_hourly', 24),
+                              settings.get('backup_keep_daily', 7), settings.get('backup_keep_weekly', 8),
+                              settings.get('backup_keep_within_hours', 24))
+        if not expired: 
+            return
+        for backup in expired:
+            Path(backup['path']).unlink(missing_ok=True)
+        for store_dir, digest in self.catalog.remove([backup['id'] for backup in expired]):
+            for path in BackupStore(Path(store_dir)).chunk_paths(digest):
+                path.unlink(missing_ok=True)
+        self._log(f"Pruned {len(expired)} old backup(s) of {Path(source).name}", LogLevel.INFO)
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._compressor: 
+            self._compressor.shutdown(wait=False, cancel_futures=True)
+
+class EngineEvents:
+    """Engine event stream ('log' and 'status'); the GUI is just one optional subscriber."""
+    def __init__(self):
+        self._subscribers: list[Callable] = []
+    def subscribe(self, callback: Callable):
+        self._subscribers.append(callback)
+    def unsubscribe(self, callback: Callable):
+        if callback in self._subscribers: 
+            self._subscribers.remove(callback)
+    def emit(self, kind: str, *args):
+        for callback in list(self._subscribers):
+            callback(kind, *args)
+
+class EngineEventQueue:
+    """Thread-safe mailbox between the engine and the UI thread; consecutive status updates collapse."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._logs: list[tuple] = []
+        self._status: Optional[tuple] = None
+        self._calls: list[tuple[int, Callable]] = []
+        self.coalesced_statuses = 0
+    def __call__(self, kind: str, *args):
+        with self._lock:
+            if kind == 'status':
+                if self._status is not None: 
+                    self.coalesced_statuses += 1
+                self._status = args
+            elif kind == 'log':
+                self._logs.append(args)
+    def dispatch(self, delay_ms: int, callback: Callable):
+        with self._lock:
+            self._calls.append((delay_ms, callback))
+    def drain(self) -> tuple[list[tuple], Optional[tuple], list[tuple[int, Callable]]]:
+        with self._lock:
+            logs, status, calls = self._logs, self._status, self._calls
+            self._logs, self._status, self._calls = [], None, []
+        return logs, status, calls
+
+class ActivityJournal:
+    """Append-only JSONL journal in size-rotated segments, with a sparse time index per segment."""
+    _SEGMENT = re.compile(r"journal-(\d{6})\.jsonl(\.gz)?$")
+    def __init__(self, directory: Path, compress_cb: Callable[[], bool] = lambda: True):
+        self._dir = directory
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._compress = compress_cb
+        self._buffer: list[dict] = []
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        segments = self.segments()
+        self._seq = 1
+        if segments:
+            match = self._SEGMENT.match(segments[-1][0].name)
+            self._seq = int(match.group(1)) + bool(match.group(2))  # keep appending unless it was already rotated
+        data_path = self._data_path(self._seq)
+        self._size = data_path.stat().st_size if data_path.exists() else 0
+        index = self.read_index(self._index_path(data_path))
+        self._last_indexed = index[-1][1] if index else 0
+    def _data_path(self, seq: int) -> Path:
+        return self._dir / f"journal-{seq:06d}.jsonl"
+    @staticmethod
+    def _index_path(data_path: Path) -> Path:
+        return data_path.with_name(data_path.name + ".idx")
+    @staticmethod
+    def read_index(path: Path) -> list[tuple[float, int]]:
+        try:
+            with open(path, 'r') as f: 
+                return [(float(ts), int(offset)) for ts, offset in (line.split() for line in f if line.strip())]
+        except (OSError, ValueError): 
+            return []
+    def segments(self) -> list[tuple[Path, list[tuple[float, int]]]]:
+        """(data file, index) per segment, oldest first; a .gz wins over a leftover plain copy."""
+        found: dict[int, Path] = {}
+        for path in self._dir.iterdir():
+            match = self._SEGMENT.match(path.name)
+            if match and (match.group(2) or int(match.group(1)) not in found): 
+                found[int(match.group(1))] = path
+        return [(found[seq], self.read_index(self._index_path(found[seq]))) for seq in sorted(found)]
+    def append(self, record: dict) -> bool:
+        """Buffers a record; returns True once the buffer is due for an early flush."""
+        with self._lock:
+            self._buffer.append(record)
+            return len(self._buffer) >= Config.Journal.FLUSH_RECORDS
+    def flush(self):
+        with self._lock:
+            records, self._buffer = self._buffer, []
+        if not records: 
+            return
+        with self._io_lock:
+            data_path = self._data_path(self._seq)
+            try:
+                with open(data_path, 'ab') as data, open(self._index_path(data_path), 'a') as index:
+                    for record in records:
+                        if self._size == 0 or self._size - self._last_indexed >= Config.Journal.INDEX_STRIDE:
+                            index.write(f"{record['ts']} {self._size}\n")
+                            self._last_indexed = self._size
+                        line = (json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n").encode('utf-8')
+                        data.write(line)
+                        self._size += len(line)
+                if self._size >= Config.Journal.SEGMENT_BYTES: 
+                    self._rotate()
+            except OSError as e:
+                print(f"Journal write failed: {e}")
+    def _rotate(self):
+        data_path = self._data_path(self._seq)
+        self._seq += 1
+        self._size = self._last_indexed = 0
+        if self._compress():
+            self._gzip_segment(data_path)
+        for path, _ in self.segments()[:-Config.Journal.MAX_SEGMENTS]:
+            for stale in (path, self._index_path(path)):
+                stale.unlink(missing_ok=True)
+    def _gzip_segment(self, data_path: Path):
+        index = self.read_index(self._index_path(data_path)) or [(0.0, 0)]
+        data = data_path.read_bytes()
+        gz_path = data_path.with_name(data_path.name + ".gz")
+        gz_tmp, idx_tmp = gz_path.with_name(gz_path.name + ".tmp"), self._index_path(gz_path).with_name(gz_path.name + ".idx.tmp")
+        ends = [offset for _, offset in index[1:]] + [len(data)]
+        with open(gz_tmp, 'wb') as out, open(idx_tmp, 'w') as out_index:
+            for (ts, start), end in zip(index, ends):
+                out_index.write(f"{ts} {out.tell()}\n")
+                out.write(gzip.compress(data[start:end], mtime=0))
+        os.replace(idx_tmp, self._index_path(gz_path))
+        os.replace(gz_tmp, gz_path)
+        data_path.unlink(missing_ok=True)
+        self._index_path(data_path).unlink(missing_ok=True)
+    def query(self, start: Optional[float] = None, end: Optional[float] = None) -> Iterator[dict]:
+        """Yields records with start <= ts <= end, oldest first."""
+        segments = self.segments()
+        for i, (path, index) in enumerate(segments):
+            next_first = segments[i + 1][1][0][0] if i + 1 < len(segments) and segments[i + 1][1] else None
+            if start is not None and next_first is not None and next_first < start: 
+                continue
+            if end is not None and index and index[0][0] > end: 
+                return
+            offset = 0
+            if start is not None and index:
+                offset = index[max(bisect.bisect_right([ts for ts, _ in index], start) - 1, 0)][1]
+            with open(path, 'rb') as raw:
+                raw.seek(offset)
+                stream = gzip.GzipFile(fileobj=raw) if path.suffix == '.gz' else raw
+                for line in stream:
+                    try: 
+                        record = json.loads(line)
+                    except ValueError:  # a line cut short by a crash
+                        continue
+                    ts = record.get('ts', 0)
+                    if start is not None and ts < start: 
+                        continue
+                    if end is not None and ts > end: 
+                        return
+                    yield record
+
+def _parse_when(text: str) -> float:
+    """Epoch seconds, an ISO date/time, or HH:MM[:SS] meaning today."""
+    try: 
+        return float(text)
+    except ValueError: 
+        pass
+    if re.fullmatch(r"\d{1,2}:\d{2}(:\d{2})?", text):
+        parts = [int(p) for p in text.split(':')] + [0]
+        return datetime.now().replace(hour=parts[0], minute=parts[1], second=parts[2], microsecond=0).timestamp()
+    return datetime.fromisoformat(text).timestamp()
+
+def run_journal(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="app.py journal", description="Query the activity journal.")
+    parser.add_argument('--since', help="epoch, ISO date/time, or HH:MM today")
+    parser.add_argument('--until', help="epoch, ISO date/time, or HH:MM today")
+    parser.add_argument('--app', help="substring of the active application")
+    parser.add_argument('--level', help="SAVE, SUCCESS, WARNING, ERROR, INFO, ACTIVE or STARTUP")
+    parser.add_argument('--contains', help="substring of the message")
+    parser.add_argument('--json', action='store_true', help="print raw JSONL records")
+    opts = parser.parse_args(argv)
+    try:
+        start = _parse_when(opts.since) if opts.since else None
+        end = _parse_when(opts.until) if opts.until else None
+    except ValueError as e:
+        parser.error(str(e))
+    journal_dir = app_data_dir() / Config.Journal.DIR_NAME
+    if not journal_dir.exists():
+        print("No journal yet.", file=sys.stderr)
+        return 1
+    for record in ActivityJournal(journal_dir).query(start, end):
+        if opts.level and record.get('level') != opts.level.upper(): 
+            continue
+        if opts.app and opts.app.lower() not in (record.get('app') or "").lower(): 
+            continue
+        if opts.contains and opts.contains.lower() not in record.get('msg', "").lower(): 
+            continue
+        if opts.json: 
+            print(json.dumps(record, ensure_ascii=False))
+        else: 
+            print(f"{datetime.fromtimestamp(record['ts']):%Y-%m-%d %H:%M:%S}  {record.get('level', ''):<8} {record.get('app') or '-':<14} {record.get('msg', '')}")
+    return 0
 
 class AutoSaveScript:
-    def __init__(self, log_cb: Callable, status_cb: Callable):
-        self._log, self._update_status = log_cb, status_cb
+    def __init__(self, dispatch: Callable[[int, Callable], object], backend: Optional[FocusBackend] = None,
+                 injector: Optional[InputInjector] = None, scheduler: Optional[Scheduler] = None,
+                 resolver: Optional[DocumentResolver] = None):
+        self.events = EngineEvents()
+        self.current_app: Optional[str] = None
+        self.journal = ActivityJournal(app_data_dir() / Config.Journal.DIR_NAME, lambda: self.settings.get('journal_compress', True))
+        self.injector = injector or InputInjector.default()
         self.settings_manager = SettingsManager()
-        self.process_monitor = ProcessMonitor(self._log)
+        self.process_monitor = ProcessMonitor(self._log, dispatch, backend)
         self.startup_manager = WindowsStartupManager()
+        self.scheduler = scheduler or Scheduler()
+        self.document_resolver = resolver or DocumentResolver()
+        self.save_tracker = SaveTracker(self.document_resolver)
+        self.adaptive_interval = AdaptiveInterval(lambda: self.settings)
+        self.save_latency = LatencyHistogram(window=Config.Save.LATENCY_WINDOW)
+        self.save_latency_total = LatencyHistogram()
+        self.focus_check_latency = LatencyHistogram(buckets=LatencyHistogram.FAST_BUCKETS)
+        self.focus_checks = self.app_switches = self.saves_injected = self.save_failures = 0
+        self.saves_unconfirmed = 0
+        self.saves_misdirected = 0
+        self.save_watcher = SaveWatcher(self.scheduler, self._on_save_confirmed, self._on_save_missed)
+        self.backup_engine = BackupEngine(self._log, self._update_status, lambda: self.settings)
         self.settings = self.settings_manager.load()
-        self.current_app: Optional[str] = None
-        self._save_timer: Optional[threading.Timer] = None
-        self._backup_timer: Optional[threading.Timer] = None
+        self._watchlist: Optional[WatchlistMatcher] = None
+        self._watchlist_version = -1
+        self._watchlist_entries: list[str] = []
+        self.metrics = self._register_metrics()
+    def _log(self, message: str, level: LogLevel):
+        self.events.emit('log', message, level)
+        if self.journal.append({'ts': round(time.time(), 3), 'level': level.name, 'app': self.current_app, 'msg': message}):
+            self.scheduler.schedule('journal_flush_now', 0, self.journal.flush, periodic=False)
+    def _update_status(self, text: str, status_type: str, app_name: str = ""):
+        self.events.emit('status', text, status_type, app_name)
     def start(self): 
         self._log("Personal Assistant started.", LogLevel.STARTUP)
+        if self.settings_manager.corrupt_backup:
+            self._log(f"Settings file was unreadable; restored defaults (old file kept as {self.settings_manager.corrupt_backup.name}).", LogLevel.WARNING)
+        self.scheduler.start()
+        self.scheduler.schedule('metrics_export', Config.Metrics.EXPORT_INTERVAL, self._export_metrics)
+        self.scheduler.schedule('journal_flush', Config.Journal.FLUSH_INTERVAL, self.journal.flush)
+        self.scheduler.schedule('settings_watch', Config.Settings.RELOAD_CHECK_INTERVAL, self.settings_manager.reload_if_changed)
         self.process_monitor.start_monitoring(self._check_active_window)
-    def _is_target(self, name: str) -> bool: 
-        return name in self.settings.get('monitored_apps', [])
+    def _is_target(self, name: str, title: str = "") -> bool: 
+        if self._watchlist is None or self._watchlist_version != self.settings_manager.version:
+            self._compile_watchlist()
+        return self._watchlist.matches(name, title)
+    def _compile_watchlist(self):
+        self._watchlist_version = self.settings_manager.version
+        entries = self.settings_manager.settings.get('monitored_apps', [])
+        if self._watchlist is None or entries != self._watchlist_entries:
+            self._watchlist = WatchlistMatcher(entries)
+            self._watchlist_entries = list(entries)
     def _check_active_window(self):
+        started = time.perf_counter()
+        try: 
+            self._check_focus()
+        finally:
+            self.focus_checks += 1
+            self.focus_check_latency.observe(time.perf_counter() - started)
+    def _check_focus(self):
         info = self.process_monitor.get_active_window_info()
-        if info and self._is_target(info[0]):
+        if info and self._is_target(info[0], info[1]):
             app_name = info[0].replace('.exe', '').title()
             if self.current_app != app_name:
+                self.app_switches += 1
                 self.current_app = app_name
-                self.settings = self.settings_manager.load()
+                _, self.settings = self.settings_manager.snapshot()  # external edits arrive via the settings_watch job
                 if self.settings.get('auto_save_enabled', True): 
                     self._update_status("Active", "ACTIVE", app_name)
                 else: 
                     self._update_status("Paused", "PAUSED", app_name)
                 self._log(f"Active application: {app_name}", LogLevel.ACTIVE)
+                self.save_tracker.reset()
                 self._start_timers()
         elif self.current_app:
             self._log(f"Stopped monitoring {self.current_app}", LogLevel.INFO)
             self._update_status("Waiting", "WAITING")
             self.current_app = None
             self._stop_timers()
+            self._persist_adaptive_profiles()
     def _start_timers(self):
         self._stop_timers()
         if self.settings.get('auto_save_enabled', True): 
@@ -621,59 +2576,127 @@ class AutoSaveScript:
         self._stop_save_timer()
         self._stop_backup_timer()
     def _start_save_timer(self):
-        self._stop_save_timer()
+        adaptive = self.settings.get('auto_save_mode', 'fixed') == 'adaptive'
         def task():
             if self.current_app and self.settings.get('auto_save_enabled', True):
+                generation = self.process_monitor.focus_generation
+                info = self.process_monitor.get_active_window_info()
+                if not info or not self._is_target(info.name, info.title): 
+                    return self._cancel_misdirected_save()
+                dirty = not self.settings.get('skip_clean_saves', True) or self.save_tracker.should_save(info)
+                if adaptive:
+                    self.scheduler.reschedule('auto_save', self.adaptive_interval.next(info.name, dirty, input_idle_seconds()))
+                if not dirty: 
+                    return
+                path = self.document_resolver.resolve(info)
+                # Resolving can take a while; make sure focus didn't move before the keystroke goes out.
+                if not self.process_monitor.still_focused(info.pid, generation): 
+                    return self._cancel_misdirected_save()
+                if path: 
+                    self.save_watcher.expect(info.name, path, '*' in info.title)
                 try: 
-                    pyautogui.hotkey('ctrl', 's')
+                    self.injector.hotkey('ctrl', 's')
+                    self.saves_injected += 1
+                    self.save_tracker.record_sent()
                 except Exception: 
-                    self._log("Auto-Save command failed.", LogLevel.ERROR)
+                    self.save_failures += 1
+                    if path: 
+                        self.save_watcher.discard(path)
+                    return self._log("Auto-Save command failed.", LogLevel.ERROR)
                 self._log(f"Auto-saved in {self.current_app}", LogLevel.SAVE)
                 self._update_status("Saved!", "SAVED")
-                if self.current_app: 
-                    self._start_save_timer()
-        self._save_timer = threading.Timer(self.settings['auto_save_interval'], task)
-        self._save_timer.start()
+        info = self.process_monitor.get_active_window_info() if adaptive else None
+        interval = self.adaptive_interval.initial(info.name) if info else self.settings['auto_save_interval']
+        self.scheduler.schedule('auto_save', interval, task)
     def _stop_save_timer(self):
-        if self._save_timer: 
-            self._save_timer.cancel()
-            self._save_timer = None
+        self.scheduler.cancel('auto_save')
+        self.save_watcher.cancel()
+    def _cancel_misdirected_save(self):
+        self.saves_misdirected += 1
+        self._log(f"Auto-save skipped: {self.current_app} is no longer focused", LogLevel.INFO)
+    def _on_save_confirmed(self, app: str, path: Path, latency: float):
+        self.save_latency.observe(latency)
+        self.save_latency_total.observe(latency)
+        if self.settings.get('auto_save_mode', 'fixed') == 'adaptive':
+            self.adaptive_interval.record_cost(app, latency)
+    def _on_save_missed(self, app: str, path: Path):
+        self.saves_unconfirmed += 1
+        self._log(f"Save of {path.name} not confirmed after {Config.Save.VERIFY_TIMEOUT:.0f} s", LogLevel.WARNING)
+    def _register_metrics(self) -> MetricsRegistry:
+        m, tracker, monitor, backups, settings = MetricsRegistry(), self.save_tracker, self.process_monitor, self.backup_engine, self.settings_manager
+        m.counter('saves_injected_total', "Ctrl+S keystrokes sent.", lambda: self.saves_injected)
+        m.counter('save_failures_total', "Ctrl+S keystrokes that failed to send.", lambda: self.save_failures)
+        m.counter('saves_skipped_clean_total', "Save ticks skipped because the document was clean.", lambda: tracker.saves_skipped)
+        m.counter('saves_noop_total', "Saves that left the file unchanged.", lambda: tracker.noop_saves)
+        m.counter('saved_bytes_total', "Size of the files written by confirmed-changed saves.", lambda: tracker.bytes_written)
+        m.counter('saves_misdirected_total', "Saves cancelled because focus had moved.", lambda: self.saves_misdirected)
+        m.counter('saves_unconfirmed_total', "Saves never seen on disk.", lambda: self.saves_unconfirmed)
+        m.histogram('save_latency_seconds', "Keystroke to file close.", self.save_latency_total)
+        for q in (0.5, 0.95, 0.99):
+            m.gauge(f'save_latency_recent_p{int(q * 100)}_seconds', f"Save latency p{int(q * 100)} over the last {Config.Save.LATENCY_WINDOW} saves.",
+                    lambda q=q: self.save_latency.quantile(q))
+        m.counter('focus_checks_total', "Foreground-window checks.", lambda: self.focus_checks)
+        m.counter('app_switches_total', "Switches to a watched application.", lambda: self.app_switches)
+        m.histogram('focus_check_seconds', "Duration of a foreground-window check.", self.focus_check_latency)
+        m.histogram('window_lookup_seconds', "Duration of get_active_window_info.", monitor.lookup_latency)
+        m.counter('process_name_cache_hits_total', "Process-name cache hits.", lambda: monitor.cache_hits)
+        m.counter('process_name_cache_misses_total', "Process-name cache misses.", lambda: monitor.cache_misses)
+        m.counter('process_name_cache_evictions_total', "Process-name cache entries dropped (dead/recycled PID or LRU).", lambda: monitor.cache_evictions)
+        m.histogram('timer_lateness_seconds', "Scheduler job start minus due time.", self.scheduler.lateness)
+        m.counter('timer_failures_total', "Scheduled jobs that raised.", lambda: self.scheduler.failures)
+        m.counter('backups_total', "Smart Backups written.", lambda: backups.completed)
+        m.counter('backup_failures_total', "Smart Backups that failed.", lambda: backups.failed)
+        m.histogram('backup_seconds', "Duration of a Smart Backup.", backups.duration)
+        m.counter('settings_writes_total', "config.json writes.", lambda: settings.write_count)
+        m.counter('settings_write_errors_total', "Failed config.json writes.", lambda: settings.write_errors)
+        m.counter('settings_reloads_total', "config.json reloads after an external change.", lambda: settings.reload_count)
+        m.histogram('settings_write_seconds', "Duration of an atomic config.json write.", settings.write_latency)
+        m.gauge('active', "1 while a watched application is focused.", lambda: int(self.current_app is not None))
+        return m
+    def _export_metrics(self):
+        try: 
+            self.metrics.export(app_data_dir())
+        except OSError as e: 
+            print(f"Metrics export failed: {e}")
     def _start_backup_timer(self):
-        self._stop_backup_timer()
         def task():
             if self.current_app and self.settings.get('smart_backup_enabled', False):
                 self._create_backup()
-                if self.current_app: 
-                    self._start_backup_timer()
-        self._backup_timer = threading.Timer(self.settings.get('smart_backup_interval', 60) * 60, task)
-        self._backup_timer.start()
+        self.scheduler.schedule('smart_backup', self.settings.get('smart_backup_interval', 60) * 60, task)
     def _stop_backup_timer(self):
-        if self._backup_timer: 
-            self._backup_timer.cancel()
-            self._backup_timer = None
+        self.scheduler.cancel('smart_backup')
     def _create_backup(self):
         info = self.process_monitor.get_active_window_info()
-        if not info or not info[1] or '*' not in info[1]: 
+        if not info: 
             return
-        try:
-            title = info[1].split(' @')[0].split(' - ')[0].replace('*', '').strip()
-            original_path = Path(title)
-            if not original_path.is_file(): 
-                self._log("Backup failed: Cannot determine file path.", LogLevel.WARNING)
-                return
-            backup_dir = original_path.parent / "Smart Backup"
-            backup_dir.mkdir(exist_ok=True)
-            timestamp = time.strftime("%Y%m%d-%H%M%S")
-            backup_filename = f"{original_path.stem}-{timestamp}{original_path.suffix}"
-            backup_path = backup_dir / backup_filename
-            pyautogui.hotkey('ctrl', 'shift', 's')
-            time.sleep(1)
-            pyautogui.write(str(backup_path), interval=0.01)
-            pyautogui.press('enter')
-            self._log(f"Smart Backup created: {backup_filename}", LogLevel.SUCCESS)
-            self._update_status("Backup!", "SAVED")
-        except Exception: 
-            self._log("Backup failed unexpectedly.", LogLevel.ERROR)
+        original_path = self.document_resolver.resolve(info)
+        if not original_path: 
+            self._log("Backup failed: Cannot determine file path.", LogLevel.WARNING)
+            return
+        future = self.backup_engine.submit(original_path)
+        future.add_done_callback(lambda f: f.cancelled() or f.result() or self.document_resolver.forget(original_path))
+    def control_handlers(self) -> dict[str, Callable]:
+        return {'status': self.status, 'reload': self.reload_settings,
+                'pause': lambda: self.update_settings({'auto_save_enabled': False}),
+                'resume': lambda: self.update_settings({'auto_save_enabled': True}),
+                'add-app': self._add_monitored_apps}
+    def _add_monitored_apps(self, *app_paths: str) -> dict:
+        for app_path in app_paths: 
+            self.add_monitored_app(app_path)
+        return {'watchlist_size': len(self.settings['monitored_apps'])}
+    def status(self) -> dict:
+        return {'pid': os.getpid(), 'active_app': self.current_app,
+                'auto_save_enabled': self.settings.get('auto_save_enabled', True),
+                'smart_backup_enabled': self.settings.get('smart_backup_enabled', False),
+                'interval_mode': self.settings.get('auto_save_mode', 'fixed'),
+                'watchlist_size': len(self.settings.get('monitored_apps', [])),
+                'compression': self.backup_engine.compression_report(),
+                'metrics': {name: value for name, value in self.metrics.collect().items() if not isinstance(value, dict)}}
+    def reload_settings(self):
+        self.settings = self.settings_manager.reload_if_changed(force=True)
+        self._log("Settings reloaded.", LogLevel.INFO)
+        if self.current_app:
+            self._start_timers()
     def update_settings(self, new_settings):
         self.settings.update(new_settings)
         if self.settings_manager.save():
@@ -696,19 +2719,33 @@ class AutoSaveScript:
                 self._log(f"Added to watchlist: {app_name}", LogLevel.SUCCESS)
             else: 
                 self._log("Failed to save new app.", LogLevel.ERROR)
+    def _persist_adaptive_profiles(self):
+        if self.adaptive_interval.profiles_changed:
+            self.adaptive_interval.profiles_changed = False
+            self.settings_manager.save()
     def cleanup(self): 
         self._stop_timers()
+        self._persist_adaptive_profiles()
+        self.settings_manager.flush()
+        self._export_metrics()
+        self.save_watcher.stop()
+        self.injector.close()
+        self.scheduler.stop()
+        self.backup_engine.shutdown()
         self.process_monitor.cleanup()
         self._log("Personal Assistant has been shut down.", LogLevel.INFO)
+        self.journal.flush()
 
 class TrayManager:
     def __init__(self, show_cb: Callable, exit_cb: Callable):
         self._show, self._exit = show_cb, exit_cb
-        self._icon: Optional[pystray.Icon] = None
+        self._icon = None
 
     def run_in_thread(self):
         if self._icon and self._icon.visible:
             return
+        import pystray
+        from PIL import Image, ImageDraw
         def create_image():
             img = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
             draw = ImageDraw.Draw(img)
@@ -723,6 +2760,165 @@ class TrayManager:
             self._icon.stop()
             self._icon = None
 
+class HeadlessLoop:
+    """Queue-driven replacement for Tk's mainloop; `after` has the same signature as Tk's."""
+    def __init__(self):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._seq = itertools.count()
+        self._running = False
+    def after(self, delay_ms: int, callback: Callable):
+        self._queue.put((time.monotonic() + delay_ms / 1000, callback))
+    def stop(self):
+        self._queue.put((0.0, None))
+    def run_forever(self):
+        self._running = True
+        pending: list = []
+        while self._running:
+            timeout = max(0.0, pending[0][0] - time.monotonic()) if pending else None
+            try:
+                due, callback = self._queue.get(timeout=timeout)
+                if callback is None: 
+                    break
+                heapq.heappush(pending, (due, next(self._seq), callback))
+            except queue.Empty:
+                pass
+            now = time.monotonic()
+            while pending and pending[0][0] <= now:
+                _, _, callback = heapq.heappop(pending)
+                try: 
+                    callback()
+                except Exception as e: 
+                    print(f"Headless callback failed: {e}")
+        self._running = False
+
+def run_headless():
+    loop = HeadlessLoop()
+    script = AutoSaveScript(loop.after)
+    def on_event(kind: str, *args):
+        if kind == 'log': 
+            print(f"[{time.strftime('%H:%M:%S')}] {args[0]}", flush=True)
+    script.events.subscribe(on_event)
+    control = ControlServer(dict(script.control_handlers(), show=lambda: "headless: no window"), loop.after)
+    try:
+        import signal
+        signal.signal(signal.SIGTERM, lambda *_: loop.stop())
+    except (ImportError, ValueError):
+        pass
+    script.start()
+    try: 
+        control.start()
+    except OSError as e: 
+        print(f"Control channel unavailable: {e}", flush=True)
+    try: 
+        loop.run_forever()
+    except KeyboardInterrupt: 
+        pass
+    finally: 
+        control.stop()
+        script.cleanup()
+
+REPLAY_WATCHED = ('photoshop.exe', 'illustrator.exe', 'premiere.exe', 'afterfx.exe', 'figma.exe', 'resolve.exe')
+REPLAY_OTHER = ('chrome.exe', 'explorer.exe', 'slack.exe', 'code.exe', 'outlook.exe', 'spotify.exe', 'teams.exe')
+
+def synthetic_trace(events: int, apps: int, seed: int) -> list[dict]:
+    """Random focus switches and title edits across `apps` processes, about half of them watched."""
+    import random
+    rng = random.Random(seed)
+    names = [(REPLAY_WATCHED if i % 2 == 0 else REPLAY_OTHER)[i // 2 % 6] for i in range(apps)]
+    pids = [4_000_000 + i for i in range(apps)]  # only ever seen by the simulated backend and _ReplayResolver
+    trace, t, current = [], 0.0, 0
+    for _ in range(events):
+        t += rng.expovariate(1 / 2.0)
+        if rng.random() < 0.02: 
+            trace.append({'t': round(t, 3), 'name': None})
+            continue
+        if rng.random() < 0.6: 
+            current = rng.randrange(apps)
+        title = f"Project {rng.randrange(200)}.doc{'*' if rng.random() < 0.5 else ''} - {names[current]}"
+        trace.append({'t': round(t, 3), 'pid': pids[current], 'name': names[current], 'title': title})
+    return trace
+
+def load_trace(path: str) -> list[dict]:
+    """Reads a JSONL trace of {"t", "pid", "name", "title"} events; a null name means nothing focused."""
+    with open(path, 'r', encoding='utf-8') as f: 
+        return sorted((json.loads(line) for line in f if line.strip()), key=lambda e: e['t'])
+
+class _ReplayResolver(DocumentResolver):
+    """Title-only resolution, so trace PIDs never reach psutil and replays stay deterministic."""
+    @staticmethod
+    def _from_open_files(pid: int, title: str) -> Optional[Path]:
+        return None
+
+def _replay_pass(trace: list[dict]) -> dict:
+    clock = [0.0]
+    scheduler = Scheduler(lambda: clock[0])
+    backend, injector = SimulatedFocusBackend(), RecordingInputInjector(lambda: clock[0])
+    script = AutoSaveScript(lambda delay, callback: callback(), backend, injector, scheduler, _ReplayResolver())
+    script.process_monitor.start_monitoring(script._check_active_window)
+    focus_latency, tick_seconds = [], 0.0
+    for event in trace:
+        started = time.perf_counter()
+        while True:
+            wait = scheduler.run_pending()
+            if wait is None or clock[0] + wait > event['t']: 
+                break
+            clock[0] += wait
+        tick_seconds += time.perf_counter() - started
+        clock[0] = event['t']
+        started = time.perf_counter()
+        if event.get('name'): 
+            backend.focus(event['pid'], event['name'], event.get('title', ""))
+        else: 
+            backend.clear()
+        focus_latency.append(time.perf_counter() - started)
+    result = {'app_switches': script.app_switches, 'saves': len(injector.actions),
+              'saves_skipped_clean': script.save_tracker.saves_skipped, 'saves_misdirected': script.saves_misdirected,
+              'timer_runs': scheduler.runs, 'timer_run_mean_us': round(tick_seconds / max(scheduler.runs, 1) * 1e6, 2),
+              'focus_latency': focus_latency}
+    script.cleanup()
+    return result
+
+def run_replay(argv: list[str]) -> int:
+    """Replays a focus trace on a fake clock and reports latency percentiles, CPU time and allocations."""
+    import argparse, tempfile, tracemalloc
+    parser = argparse.ArgumentParser(prog="app.py --replay", description="Replay a focus trace through the engine.")
+    parser.add_argument('--replay', metavar='TRACE', nargs='?', const=None, help="JSONL trace; synthetic if omitted")
+    parser.add_argument('--events', type=int, default=5000)
+    parser.add_argument('--apps', type=int, default=40)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--max-p99-ms', type=float)
+    opts, _ = parser.parse_known_args(argv)
+    trace = load_trace(opts.replay) if opts.replay else synthetic_trace(opts.events, opts.apps, opts.seed)
+    saved_appdata = os.environ.get('APPDATA')
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ['APPDATA'] = scratch  # keep config, catalog and metrics away from the real profile
+        try:
+            cpu, wall = time.process_time(), time.perf_counter()
+            result = _replay_pass(trace)
+            cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+            tracemalloc.start()
+            _replay_pass(trace)
+            _, peak = tracemalloc.get_traced_memory()
+            top = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, __file__)]).statistics('lineno')[:5]
+            tracemalloc.stop()
+        finally:
+            if saved_appdata is None: 
+                os.environ.pop('APPDATA', None)
+            else: 
+                os.environ['APPDATA'] = saved_appdata
+    latency = sorted(result.pop('focus_latency'))
+    pick = lambda q: round(latency[min(int(q * len(latency)), len(latency) - 1)] * 1000, 4) if latency else None
+    report = dict(trace=opts.replay or f"synthetic(events={opts.events}, apps={opts.apps}, seed={opts.seed})",
+                  events=len(trace), **result,
+                  focus_latency_ms={'p50': pick(0.5), 'p95': pick(0.95), 'p99': pick(0.99), 'max': pick(1.0)},
+                  cpu_seconds=round(cpu, 4), wall_seconds=round(wall, 4), peak_alloc_kib=round(peak / 1024, 1),
+                  retained_by_line=[f"{stat.traceback[0].lineno}: {stat.size / 1024:.1f} KiB in {stat.count} blocks" for stat in top])
+    print(json.dumps(report, indent=2))
+    if opts.max_p99_ms is not None and latency and report['focus_latency_ms']['p99'] > opts.max_p99_ms:
+        print(f"p99 focus latency {report['focus_latency_ms']['p99']} ms exceeds {opts.max_p99_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
 if __name__ == "__main__":
     if WINDOWS_API_AVAILABLE:
         try:
@@ -730,5 +2926,14 @@ if __name__ == "__main__":
         except Exception: 
             pass
     
-    app = AppUI()
-    app.mainloop()
\ No newline at end of file
+    if "--replay" in _ARGV:
+        sys.exit(run_replay(_ARGV))
+    if SUBCOMMAND == "journal":
+        sys.exit(run_journal(_ARGV[1:]))
+    if SUBCOMMAND == "restore":
+        sys.exit(run_restore(_ARGV[1:]))
+    if HEADLESS:
+        run_headless()
+    else:
+        app = AppUI()
+        app.mainloop()
\ No newline at end of file
@@ -0,0 +1,21 @@
+"""Imports app.py with its data folder in a throwaway temp dir; bench scripts start here."""
+import atexit, os, shutil, statistics, sys, tempfile
+from pathlib import Path
+
+ARGS = sys.argv[1:]
+SCRATCH = Path(tempfile.mkdtemp(prefix="nit-bench-"))
+os.environ['APPDATA'] = str(SCRATCH)
+atexit.register(shutil.rmtree, SCRATCH, ignore_errors=True)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+
+__all__ = ["ARGS", "SCRATCH", "app", "summarize"]
+
+
+def summarize(seconds: list[float], unit: str = "us") -> str:
+    scale = {"us": 1e6, "ms": 1e3, "s": 1}[unit]
+    ordered = sorted(seconds)
+    pick = lambda q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] * scale
+    return (f"n={len(ordered)} mean={statistics.fmean(ordered) * scale:.2f}{unit} "
+            f"p50={pick(0.5):.2f}{unit} p99={pick(0.99):.2f}{unit} max={ordered[-1] * scale:.2f}{unit}")
@@ -0,0 +1,69 @@
+"""Backup wall time and UI blocking: BackupEngine on its worker vs the old Ctrl+Shift+S macro.
+
+A 10 ms heartbeat thread stands in for the Tk loop; its worst gap is the UI stall a backup causes.
+The macro is not replayed (it would type into whatever window has focus); its cost is pyautogui's
+fixed timings: hotkey + PAUSE, sleep(1), write(interval=0.01) + PAUSE, press + PAUSE.
+
+Usage: python bench/bench_backup.py [sizes in MiB, e.g. 1 16 64]
+"""
+import os, threading, time
+from _bootstrap import ARGS, SCRATCH, app
+
+SIZES_MIB = [float(a) for a in ARGS] or [1, 16, 64]
+HEARTBEAT = 0.010
+PYAUTOGUI_PAUSE = 0.1
+
+
+class Heartbeat(threading.Thread):
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.worst = 0.0
+        self.stopped = threading.Event()
+    def run(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(HEARTBEAT):
+            now = time.perf_counter()
+            self.worst = max(self.worst, now - last - HEARTBEAT)
+            last = now
+
+
+def macro_seconds(backup_path: str) -> float:
+    return (PYAUTOGUI_PAUSE + 1 + 0.01 * len(backup_path) + PYAUTOGUI_PAUSE + PYAUTOGUI_PAUSE)
+
+
+def run(size_mib: float, dedup: bool) -> tuple[float, float, float]:
+    folder = SCRATCH / f"docs-{size_mib:g}-{int(dedup)}"
+    folder.mkdir()
+    document = folder / "drawing.psd"
+    document.write_bytes(os.urandom(int(size_mib * 1024 * 1024)))
+    engine = app.BackupEngine(lambda *a: None, lambda *a: None, lambda: {'smart_backup_dedup': dedup})
+    warmup = folder / "warmup.txt"
+    warmup.write_bytes(b"x")
+    engine.submit(warmup).result()  # the worker thread starts on first submit
+    heartbeat = Heartbeat()
+    heartbeat.start()
+    started = time.perf_counter()
+    future = engine.submit(document)
+    blocked = time.perf_counter() - started
+    future.result()
+    wall = time.perf_counter() - started
+    heartbeat.stopped.set()
+    heartbeat.join()
+    engine.shutdown()
+    return blocked, wall, heartbeat.worst
+
+
+def main():
+    example = str(SCRATCH / "docs" / app.Config.Backup.FOLDER_NAME / "drawing-20250101-120000.psd")
+    macro = macro_seconds(example)
+    print(f"macro (modelled): {macro * 1e3:.0f} ms wall, all of it on the calling thread")
+    for size in SIZES_MIB:
+        for dedup in (False, True):
+            blocked, wall, stall = run(size, dedup)
+            mode = "dedup" if dedup else "copy "
+            print(f"{size:6g} MiB {mode}: submit blocks {blocked * 1e6:7.1f} us, "
+                  f"wall {wall * 1e3:8.1f} ms, worst UI stall {stall * 1e3:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
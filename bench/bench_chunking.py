@@ -0,0 +1,51 @@
+"""Chunking throughput and dedup ratio of the Smart Backup store.
+
+Chunks a random file, stores it, then stores an edited copy (a few byte flips plus an insertion
+near the middle) against the first manifest and reports how many bytes the second backup wrote.
+
+Usage: python bench/bench_chunking.py [MiB]
+"""
+import io, os, random, time
+from _bootstrap import ARGS, SCRATCH, app
+
+SIZE = int(float(ARGS[0]) if ARGS else 64) * 1024 * 1024
+
+
+def edit(data: bytes, rng: random.Random) -> bytes:
+    edited = bytearray(data)
+    for _ in range(5):
+        pos = rng.randrange(len(edited))
+        edited[pos] ^= 0xFF
+    middle = len(edited) // 2
+    edited[middle:middle] = os.urandom(4096)
+    return bytes(edited)
+
+
+def main():
+    rng = random.Random(12)
+    data = os.urandom(SIZE)
+    started = time.perf_counter()
+    chunks = sum(1 for _ in app.content_defined_chunks(io.BytesIO(data)))
+    elapsed = time.perf_counter() - started
+    print(f"chunker : {SIZE / elapsed / 1e6:7.1f} MB/s, {chunks} chunks, avg {SIZE // max(chunks, 1)} bytes")
+
+    folder = SCRATCH / "docs"
+    store = app.BackupStore(folder / app.Config.Backup.FOLDER_NAME)
+    store.backup_dir.mkdir(parents=True)
+    document = folder / "drawing.psd"
+    document.write_bytes(data)
+    started = time.perf_counter()
+    first = store.add(document, store.backup_dir / "v1.json")
+    elapsed = time.perf_counter() - started
+    print(f"store v1: {SIZE / elapsed / 1e6:7.1f} MB/s, wrote {first['new_bytes']} of {first['size']} bytes")
+
+    document.write_bytes(edit(data, rng))
+    started = time.perf_counter()
+    second = store.add(document, store.backup_dir / "v2.json", first)
+    elapsed = time.perf_counter() - started
+    print(f"store v2: {second['size'] / elapsed / 1e6:7.1f} MB/s, wrote {second['new_bytes']} of {second['size']} bytes "
+          f"(dedup ratio {1 - second['new_bytes'] / second['size']:.2%} reused)")
+
+
+if __name__ == "__main__":
+    main()
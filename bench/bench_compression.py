@@ -0,0 +1,88 @@
+"""Per-format compression ratio and throughput of compress_backup_files for lzma and zstd.
+
+The inputs are synthetic stand-ins shaped like the real formats: a PSD-like file (header plus planar
+8-bit channels of gradients, flat fills and sensor noise), an AI-like file (PDF/PostScript text with
+an embedded raster stream) and an INDD-like file (fixed-size binary records, zero-padded pages and
+a few embedded previews). Real documents vary a lot; pass your own files to measure them instead.
+
+Usage: python bench/bench_compression.py [--mib 8] [--runs 3] [FILE ...]
+"""
+import argparse, importlib.util, os, random, struct
+from pathlib import Path
+from _bootstrap import ARGS, SCRATCH, app
+
+
+def psd_like(size: int, rng: random.Random) -> bytes:
+    width = 1024
+    rows = []
+    for y in range(size // width):
+        band = y // 64 % 4
+        if band == 0: 
+            rows.append(bytes((x + y) & 0xFF for x in range(width)))  # gradient
+        elif band == 1: 
+            rows.append(bytes([y & 0xFF]) * width)  # flat fill
+        else: 
+            rows.append(bytes(min(255, max(0, 128 + int(rng.gauss(0, 12 * band)))) for _ in range(width)))  # noise
+    return b"8BPS" + struct.pack(">HxxxxxxHIIHH", 1, 3, size // width // 3, width, 8, 3) + b"".join(rows)
+
+
+def ai_like(size: int, rng: random.Random) -> bytes:
+    ops = ["m", "l", "c", "h", "f", "S", "q", "Q", "cm", "rg", "RG", "w"]
+    out, written = [b"%PDF-1.6\n%\xe2\xe3\xcf\xd3\n%AI24_FileFormat 4.0\n"], 0
+    while written < size * 3 // 4:
+        line = " ".join(f"{rng.uniform(0, 2000):.3f}" for _ in range(rng.randint(2, 6))) + f" {rng.choice(ops)}\n"
+        out.append(line.encode())
+        written += len(line)
+    out.append(b"stream\n" + os.urandom(size - written) + b"\nendstream\n%%EOF\n")  # an embedded, already compressed raster
+    return b"".join(out)
+
+
+def indd_like(size: int, rng: random.Random) -> bytes:
+    page, out = 4096, bytearray(b"\x06\x06\xed\xf5\xd8\x1d\x46\xe5\xbd\x31\xef\xe7\xfe\x74\xb7\x1d")
+    while len(out) < size:
+        kind = rng.random()
+        if kind < 0.5: 
+            out += b"".join(struct.pack("<IIHH16s", i, rng.randrange(1 << 20), rng.randrange(64), 0, b"Paragraph Style ") for i in range(page // 28))
+        elif kind < 0.8: 
+            out += bytes(page)  # unused page
+        else: 
+            out += os.urandom(page)  # JPEG preview fragment
+        out += bytes(-len(out) % page)
+    return bytes(out[:size])
+
+
+def measure(name: str, data: bytes, codec: str, runs: int) -> tuple[float, float]:
+    ratios, speeds = [], []
+    for run in range(runs):
+        path = SCRATCH / f"{name}.{codec}.{run}"
+        path.write_bytes(data)
+        (_, compressed, in_size, out_size, seconds), = app.compress_backup_files([str(path)], codec)
+        Path(compressed).unlink()
+        ratios.append(out_size / in_size)
+        speeds.append(in_size / seconds / 1e6)
+    return min(ratios), sorted(speeds)[len(speeds) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench_compression.py")
+    parser.add_argument("files", nargs="*", type=Path)
+    parser.add_argument("--mib", type=float, default=8)
+    parser.add_argument("--runs", type=int, default=3)
+    opts = parser.parse_args(ARGS)
+    rng, size = random.Random(14), int(opts.mib * 1024 * 1024)
+    if opts.files: 
+        inputs = {f.name: f.read_bytes() for f in opts.files}
+    else: 
+        inputs = {"sample.psd": psd_like(size, rng), "sample.ai": ai_like(size, rng), "sample.indd": indd_like(size, rng)}
+    codecs = ["lzma"] + (["zstd"] if importlib.util.find_spec("zstandard") else [])
+    if "zstd" not in codecs: 
+        print("zstandard not installed; zstd skipped")
+    print(f"{'input':<16}{'codec':<6}{'MiB':>7}{'ratio':>8}{'MB/s':>9}")
+    for name, data in inputs.items():
+        for codec in codecs:
+            ratio, speed = measure(name, data, codec, opts.runs)
+            print(f"{name:<16}{codec:<6}{len(data) / 2**20:>7.1f}{ratio:>8.1%}{speed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
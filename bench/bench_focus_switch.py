@@ -0,0 +1,31 @@
+"""Focus-switch latency with settings reloaded from disk on every switch (before) vs the in-memory copy (after).
+
+Usage: python bench/bench_focus_switch.py [switches]
+"""
+import os, time
+from _bootstrap import ARGS, app, summarize
+
+SWITCHES = int(ARGS[0]) if ARGS else 2000
+
+
+def run(reload_every_switch: bool) -> list[float]:
+    backend = app.SimulatedFocusBackend()
+    script = app.AutoSaveScript(lambda delay, callback: callback(), backend, app.RecordingInputInjector(),
+                                app.Scheduler(lambda: 0.0))
+    if reload_every_switch:  # what _check_active_window did before: settings_manager.load() per switch
+        check_focus = script._check_focus
+        script._check_focus = lambda: (script.settings_manager.load(), check_focus())
+    script.process_monitor.start_monitoring(script._check_active_window)
+    samples = []
+    for i in range(SWITCHES):
+        backend.focus(os.getpid() + 1, 'chrome.exe', "Browser")
+        started = time.perf_counter()
+        backend.focus(os.getpid(), 'photoshop.exe', f"poster-{i % 7}.psd @ 33%")
+        samples.append(time.perf_counter() - started)
+    script.cleanup()
+    return samples
+
+
+if __name__ == "__main__":
+    print("before (load per switch):", summarize(run(True)))
+    print("after  (in-memory)      :", summarize(run(False)))
@@ -0,0 +1,62 @@
+"""Per-action injection latency of the input backends, against pyautogui with its default PAUSE.
+
+WARNING: with --send this presses Shift in whatever window has focus, once per sample. Shift alone
+types nothing, but focus a harmless window (an empty text editor) before running it.
+Without --send only the recording injector is timed, as a baseline for the harness overhead.
+
+Usage: python bench/bench_injection.py --send [--backend default|win32-sendinput|xtest|pyautogui] [-n 200]
+"""
+import argparse, os, sys, time
+from _bootstrap import ARGS, app, summarize
+
+BACKENDS = {
+    "win32-sendinput": lambda: app.SendInputInjector(),
+    "xtest": lambda: app.XTestInputInjector(),
+    "pyautogui": lambda: app.PyAutoGUIInjector(),
+    "default": lambda: app.InputInjector.default(),
+}
+
+
+def time_hotkey(hotkey, samples: int) -> list[float]:
+    seconds = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hotkey('shift')
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="bench_injection.py")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="default")
+    parser.add_argument("--send", action="store_true", help="send real key events to the focused window")
+    parser.add_argument("-n", type=int, default=200)
+    args = parser.parse_args(ARGS)
+
+    print(f"recording (baseline)   : {summarize(time_hotkey(app.RecordingInputInjector().hotkey, args.n))}")
+    if not args.send:
+        print("pass --send to time the real backends (sends Shift key events)")
+        return
+    if sys.platform.startswith('linux') and not os.getenv('DISPLAY'):
+        print("no display available; nothing to inject into")
+        return
+    try:
+        injector = BACKENDS[args.backend]()
+        injector.hotkey('shift')
+    except Exception as e:
+        print(f"backend {args.backend} unavailable: {e}")
+        return
+    print(f"{injector.name:<23}: {summarize(time_hotkey(injector.hotkey, args.n))}")
+    injector.close()
+    try:
+        pyautogui = app._pyautogui()
+    except Exception as e:
+        print(f"pyautogui unavailable: {e}")
+        return
+    # The pre-batching path: pyautogui with its default PAUSE after every call.
+    samples = max(1, min(args.n, 20))
+    print(f"pyautogui, PAUSE={pyautogui.PAUSE:<5}: {summarize(time_hotkey(pyautogui.hotkey, samples), 'ms')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""500 add_monitored_app calls: debounced background writes (after) vs a json.dump per call (before).
+
+Usage: python bench/bench_settings.py [calls]
+"""
+import json, os, time
+from _bootstrap import ARGS, SCRATCH, app
+
+CALLS = int(ARGS[0]) if ARGS else 500
+
+
+def before() -> tuple[float, int]:
+    # What SettingsManager.save() did before: rewrite config.json synchronously on every change.
+    path, settings = SCRATCH / "config-before.json", {'monitored_apps': []}
+    started = time.perf_counter()
+    for i in range(CALLS):
+        settings['monitored_apps'].append(f"tool{i:04d}.exe")
+        with open(path, 'w') as f:
+            json.dump(settings, f, indent=4)
+    return time.perf_counter() - started, CALLS
+
+
+def after() -> tuple[float, float, int]:
+    script = app.AutoSaveScript(lambda delay, callback: callback(), app.SimulatedFocusBackend(),
+                                app.RecordingInputInjector(), app.Scheduler(lambda: 0.0))
+    manager = script.settings_manager
+    manager.flush()
+    writes = manager.write_count
+    started = time.perf_counter()
+    for i in range(CALLS):
+        script.add_monitored_app(os.path.join("C:/Apps", f"tool{i:04d}.exe"))
+    calls = time.perf_counter() - started
+    manager.flush()
+    total = time.perf_counter() - started
+    written = manager.write_count - writes
+    script.cleanup()
+    return calls, total, written
+
+
+if __name__ == "__main__":
+    elapsed, writes = before()
+    print(f"before: {elapsed * 1e3:8.2f} ms for {CALLS} calls, {writes} writes")
+    calls, total, writes = after()
+    print(f"after : {calls * 1e3:8.2f} ms for {CALLS} calls ({total * 1e3:.2f} ms incl. flush), {writes} write(s)")
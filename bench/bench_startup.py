@@ -0,0 +1,55 @@
+"""Import time and time-to-first-frame of the GUI over N launches, with a cold and a warm icon cache.
+
+Each launch runs `app.py --measure-startup`, which prints both numbers once the first frame is drawn
+and exits. "cold" launches get a fresh, empty app data folder (no icon_cache/, no config.json);
+"warm" launches share one folder primed by an untimed launch. Needs a display and the GUI dependencies.
+
+Usage: python bench/bench_startup.py [runs]
+"""
+import os, re, shutil, statistics, subprocess, sys, tempfile
+from pathlib import Path
+
+ARGS = sys.argv[1:]
+RUNS = int(ARGS[0]) if ARGS else 5
+APP = Path(__file__).resolve().parent.parent / "app.py"
+RESULT = re.compile(r"import_ms=([\d.]+) first_frame_ms=([\d.]+)")
+
+
+def launch(appdata: str) -> tuple[float, float]:
+    env = dict(os.environ, APPDATA=appdata)
+    proc = subprocess.run([sys.executable, str(APP), "--measure-startup"], env=env, capture_output=True, text=True, timeout=120)
+    match = RESULT.search(proc.stdout)
+    if not match:
+        lines = (proc.stderr or proc.stdout).strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"exit code {proc.returncode}")
+    return float(match.group(1)), float(match.group(2))
+
+
+def report(label: str, samples: list[tuple[float, float]]):
+    imports, frames = [s[0] for s in samples], [s[1] for s in samples]
+    print(f"{label}: import median {statistics.median(imports):7.1f} ms (min {min(imports):.1f}), "
+          f"first frame median {statistics.median(frames):7.1f} ms (min {min(frames):.1f})")
+
+
+def main():
+    if sys.platform.startswith('linux') and not os.getenv('DISPLAY'):
+        print("no display available; the startup benchmark needs to open the window")
+        return
+    scratch = Path(tempfile.mkdtemp(prefix="nit-bench-startup-"))
+    try:
+        warm_dir = str(scratch / "warm")
+        try:
+            launch(warm_dir)  # primes icon_cache/ and config.json
+        except RuntimeError as e:
+            print(f"app.py could not start: {e.args[0]}")
+            return
+        cold = [launch(str(scratch / f"cold-{run}")) for run in range(RUNS)]
+        warm = [launch(warm_dir) for _ in range(RUNS)]
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+    report(f"cold ({RUNS} runs)", cold)
+    report(f"warm ({RUNS} runs)", warm)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""10k watchlist lookups against a 1k-entry list: linear `name in list` vs the compiled WatchlistMatcher.
+
+Usage: python bench/bench_watchlist.py [lookups] [entries]
+"""
+import random, time
+from _bootstrap import ARGS, app
+
+LOOKUPS = int(ARGS[0]) if ARGS else 10_000
+ENTRIES = int(ARGS[1]) if len(ARGS) > 1 else 1_000
+
+
+def build_watchlist(rng: random.Random) -> list[str]:
+    exact = [f"tool{i:04d}.exe" for i in range(int(ENTRIES * 0.9))]
+    globs = [f"suite{i:03d}_*.exe" for i in range(int(ENTRIES * 0.08))]
+    titles = [f"title:*project{i:03d}*" for i in range(ENTRIES - len(exact) - len(globs))]
+    entries = exact + globs + titles
+    rng.shuffle(entries)
+    return entries
+
+
+def main():
+    rng = random.Random(7)
+    entries = build_watchlist(rng)
+    queries = []
+    for _ in range(LOOKUPS):
+        kind = rng.random()
+        if kind < 0.4:
+            queries.append((f"tool{rng.randrange(int(ENTRIES * 1.5)):04d}.exe", "Untitled"))
+        elif kind < 0.6:
+            queries.append((f"suite{rng.randrange(100):03d}_2025.exe", "Untitled"))
+        else:
+            queries.append(("chrome.exe", f"Tab - project{rng.randrange(200):03d} notes"))
+
+    started = time.perf_counter()
+    linear_hits = sum(name in entries for name, _ in queries)
+    linear = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = app.WatchlistMatcher(entries)
+    compile_time = time.perf_counter() - started
+    started = time.perf_counter()
+    matcher_hits = sum(matcher.matches(name, title) for name, title in queries)
+    compiled = time.perf_counter() - started
+
+    print(f"{LOOKUPS} lookups, {ENTRIES} entries")
+    print(f"linear list : {linear * 1e3:8.2f} ms ({linear / LOOKUPS * 1e6:.2f} us/lookup, {linear_hits} hits, exact names only)")
+    print(f"matcher     : {compiled * 1e3:8.2f} ms ({compiled / LOOKUPS * 1e6:.2f} us/lookup, {matcher_hits} hits incl. globs/titles)")
+    print(f"compile once: {compile_time * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+from app import BackupStore, Config, compress_backup_files, run_restore
+
+
+def make_store(tmp_path, size=3 * 1024 * 1024):
+    document = tmp_path / "poster.psd"
+    document.write_bytes(os.urandom(size))
+    store = BackupStore(tmp_path / Config.Backup.FOLDER_NAME)
+    store.backup_dir.mkdir()
+    manifest_path = store.backup_dir / f"poster-1.psd{Config.Backup.MANIFEST_SUFFIX}"
+    manifest = store.add(document, manifest_path)
+    return document, store, manifest_path, manifest
+
+
+def test_restore_round_trips_raw_chunks(tmp_path):
+    document, store, manifest_path, manifest = make_store(tmp_path)
+    assert len(manifest['chunks']) > 1
+    restored = store.restore(manifest_path, tmp_path / "restored.psd")
+    assert restored.read_bytes() == document.read_bytes()
+
+
+@pytest.mark.parametrize('codec', ['lzma', 'zstd'])
+def test_restore_round_trips_compressed_chunks(tmp_path, codec):
+    if codec == 'zstd':
+        pytest.importorskip("zstandard")
+    document, store, manifest_path, _ = make_store(tmp_path)
+    results = compress_backup_files([str(p) for p in store.written], codec)
+    suffix = Config.Backup.COMPRESSION_SUFFIXES[codec]
+    assert results and all(compressed.endswith(suffix) for _, compressed, _, _, _ in results)
+    assert not any(p.exists() for p in store.written)
+    restored = store.restore(manifest_path, tmp_path / "restored.psd")
+    assert restored.read_bytes() == document.read_bytes()
+
+
+def test_restore_rejects_corrupt_chunk_and_leaves_nothing(tmp_path):
+    _, store, manifest_path, manifest = make_store(tmp_path)
+    chunk = store.chunk_path(manifest['chunks'][-1][0])
+    data = bytearray(chunk.read_bytes())
+    data[0] ^= 0xFF
+    chunk.write_bytes(bytes(data))
+    destination = tmp_path / "restored.psd"
+    with pytest.raises(IOError, match="Corrupt backup chunk"):
+        store.restore(manifest_path, destination)
+    assert not destination.exists()
+    assert not destination.with_name(destination.name + ".partial").exists()
+
+
+def test_restore_command_writes_next_to_manifest_and_refuses_to_overwrite(tmp_path, capsys):
+    document, store, manifest_path, _ = make_store(tmp_path, size=64 * 1024)
+    assert run_restore([str(manifest_path)]) == 0
+    restored = store.backup_dir / "poster-1.psd"
+    assert restored.read_bytes() == document.read_bytes()
+    assert run_restore([str(manifest_path)]) == 1
+    assert "already exists" in capsys.readouterr().err
+    assert run_restore([str(manifest_path), str(tmp_path), '--force']) == 0
+    assert (tmp_path / "poster-1.psd").read_bytes() == document.read_bytes()
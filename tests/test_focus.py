@@ -0,0 +1,138 @@
+import os
+import shutil
+import subprocess
+import threading
+import time
+
+import pytest
+
+import app
+from app import (AutoSaveScript, FocusBackend, NullFocusBackend, PollingFocusBackend, ProcessMonitor,
+                 RecordingInputInjector, Scheduler, SimulatedFocusBackend)
+
+
+class BrokenEventsBackend(SimulatedFocusBackend):
+    """Reports the foreground window but cannot deliver change events."""
+    def start(self, on_change):
+        raise RuntimeError("no hook")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setenv('APPDATA', str(tmp_path))
+    dispatched = []
+
+    def dispatch(delay, callback):
+        dispatched.append(delay)
+        callback()
+
+    backend = SimulatedFocusBackend()
+    script = AutoSaveScript(dispatch, backend, RecordingInputInjector(), Scheduler(lambda: 0.0))
+    logs = []
+    script.events.subscribe(lambda kind, *args: logs.append(args[0]) if kind == 'log' else None)
+    script.process_monitor.start_monitoring(script._check_active_window)
+    yield script, backend, dispatched, logs
+    script.cleanup()
+
+
+def test_focus_events_flow_through_dispatch_to_the_engine(engine):
+    script, backend, dispatched, logs = engine
+    monitor = script.process_monitor
+    assert "Real-time monitoring enabled." in logs
+    backend.focus(os.getpid(), 'photoshop.exe', "poster.psd @ 33%")
+    assert dispatched == [0] and monitor.focus_generation == 1
+    assert script.current_app == "Photoshop" and script.app_switches == 1
+    assert script.scheduler.is_scheduled('auto_save')
+    backend.focus(os.getpid() + 1, 'chrome.exe', "Docs")
+    assert monitor.focus_generation == 2 and script.current_app is None
+    assert not script.scheduler.is_scheduled('auto_save')
+    assert "Stopped monitoring Photoshop" in logs
+
+
+def test_still_focused_trusts_the_generation_only_for_event_backends(engine):
+    script, backend, _, _ = engine
+    monitor = script.process_monitor
+    backend.focus(os.getpid(), 'photoshop.exe', "poster.psd")
+    generation = monitor.focus_generation
+    assert monitor.still_focused(os.getpid(), generation)
+    backend.focus(os.getpid() + 1, 'chrome.exe', "Docs")
+    assert not monitor.still_focused(os.getpid(), generation)
+
+
+def test_backend_without_events_falls_back_to_polling():
+    backend, changes, logs = BrokenEventsBackend(), threading.Event(), []
+    backend.focus(os.getpid(), 'photoshop.exe', "poster.psd")
+    monitor = ProcessMonitor(lambda message, level: logs.append(message), lambda delay, callback: callback(), backend)
+    monitor.start_monitoring(changes.set)
+    try:
+        assert isinstance(monitor.backend, PollingFocusBackend)
+        assert "Event monitoring unavailable. Using fallback polling." in logs
+        assert changes.wait(1)  # the first poll reports the current window
+        assert monitor.focus_generation == 1
+        assert monitor.get_active_window_info().name == 'photoshop.exe'
+    finally:
+        monitor.cleanup()
+
+
+def test_polling_backend_reports_pid_changes():
+    source, seen = SimulatedFocusBackend(), []
+    source.focus(1, 'a.exe')
+    poller = PollingFocusBackend(source, interval=0.01)
+    poller.start(lambda: seen.append(source.foreground()[0]))
+    try:
+        deadline = time.monotonic() + 1
+        while not seen and time.monotonic() < deadline:
+            time.sleep(0.01)
+        source.focus(2, 'b.exe')  # the source was never started, so only the poller can notice
+        while len(seen) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        poller.stop()
+    assert seen[:2] == [1, 2]
+
+
+def test_null_backend_disables_monitoring_without_errors():
+    logs = []
+    monitor = ProcessMonitor(lambda message, level: logs.append(message), lambda delay, callback: callback(), NullFocusBackend())
+    monitor.start_monitoring(lambda: None)
+    assert logs == ["No foreground-window API available; monitoring disabled."]
+    assert monitor.get_active_window_info() is None
+    monitor.cleanup()
+    with pytest.raises(NotImplementedError):
+        FocusBackend().start(lambda: None)
+
+
+@pytest.fixture
+def x_display(monkeypatch):
+    if not app.XLIB_AVAILABLE:
+        pytest.skip("python-xlib not installed")
+    if os.getenv('DISPLAY'):
+        yield os.environ['DISPLAY']
+        return
+    if not shutil.which('Xvfb'):
+        pytest.skip("no DISPLAY and no Xvfb")
+    server = subprocess.Popen(['Xvfb', ':97', '-nolisten', 'tcp'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    monkeypatch.setenv('DISPLAY', ':97')
+    time.sleep(0.5)
+    yield ':97'
+    server.terminate()
+    server.wait()
+
+
+def test_x11_backend_follows_net_active_window(x_display):
+    from Xlib import Xatom, display as xdisplay
+    client = xdisplay.Display(x_display)
+    root = client.screen().root
+    window = root.create_window(0, 0, 10, 10, 0, client.screen().root_depth)
+    window.change_property(client.intern_atom('_NET_WM_PID'), Xatom.CARDINAL, 32, [4242])
+    window.change_property(client.intern_atom('_NET_WM_NAME'), client.intern_atom('UTF8_STRING'), 8, "poster* - Photoshop".encode())
+    backend, changed = app.X11FocusBackend(x_display), threading.Event()
+    backend.start(changed.set)
+    try:
+        root.change_property(client.intern_atom('_NET_ACTIVE_WINDOW'), Xatom.WINDOW, 32, [window.id])
+        client.flush()
+        assert changed.wait(2)
+        assert backend.foreground() == (4242, "poster* - Photoshop")
+    finally:
+        backend.stop()
+        client.close()
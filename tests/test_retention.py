@@ -0,0 +1,88 @@
+import json
+import os
+from datetime import datetime, timedelta
+
+from app import BackupCatalog, BackupEngine, BackupStore, gfs_expired
+
+
+def backups_at(*moments):
+    return [{'id': i, 'created': moment.timestamp()} for i, moment in enumerate(moments)]
+
+
+def expired_at(backups, *, hourly=0, daily=0, weekly=0, within=0, now=None):
+    now = now or max(b['created'] for b in backups) + 1
+    return sorted(datetime.fromtimestamp(b['created']) for b in gfs_expired(backups, hourly, daily, weekly, within, now))
+
+
+def test_newest_backup_is_always_kept():
+    moments = [datetime(2025, 3, 1) - timedelta(days=n) for n in range(5)]
+    assert expired_at(backups_at(*moments), now=datetime(2026, 1, 1).timestamp()) == sorted(moments[1:])
+    assert gfs_expired([], 1, 1, 1, 24) == []
+
+
+def test_keep_within_window_keeps_every_recent_backup():
+    now = datetime(2025, 3, 10, 12, 0)
+    moments = [now - timedelta(minutes=10 * n) for n in range(1, 6 * 30)]  # every 10 min for 30 h
+    expired = expired_at(backups_at(*moments), within=24, now=now.timestamp())
+    assert expired == sorted(m for m in moments if m < now - timedelta(hours=24))
+
+
+def test_hourly_buckets_split_on_the_hour():
+    last_of_10, first_of_11, late_11 = datetime(2025, 3, 10, 10, 59, 59), datetime(2025, 3, 10, 11), datetime(2025, 3, 10, 11, 30)
+    assert expired_at(backups_at(last_of_10, first_of_11, late_11), hourly=2) == [first_of_11]
+
+
+def test_daily_buckets_split_at_midnight():
+    noon, before_midnight, after_midnight = datetime(2025, 3, 9, 12), datetime(2025, 3, 9, 23, 59), datetime(2025, 3, 10, 0, 1)
+    older = datetime(2025, 3, 8, 18)
+    assert expired_at(backups_at(older, noon, before_midnight, after_midnight), daily=2) == [older, noon]
+
+
+def test_weekly_buckets_follow_iso_weeks_across_the_year_end():
+    moments = [datetime(2024, 12, d, 12) for d in (22, 23, 29, 30, 31)]  # Sun W51, Mon W52, Sun W52, Mon/Tue 2025-W01
+    expired = expired_at(backups_at(*moments), weekly=2)
+    assert expired == [datetime(2024, 12, 22, 12), datetime(2024, 12, 23, 12), datetime(2024, 12, 30, 12)]
+
+
+def test_periods_combine():
+    now = datetime(2025, 3, 10, 12)
+    moments = [now - timedelta(hours=n) for n in range(0, 24 * 21, 3)]
+    kept = {datetime.fromtimestamp(b['created']) for b in backups_at(*moments)} - set(expired_at(backups_at(*moments), hourly=4, daily=3, weekly=3, now=now.timestamp()))
+    assert {now - timedelta(hours=n) for n in (0, 3, 6, 9)} <= kept  # four newest hours
+    assert len({m.date() for m in kept}) >= 3 and len({m.isocalendar()[:2] for m in kept}) == 3
+
+
+def test_catalog_remove_returns_only_unreferenced_chunks(tmp_path):
+    catalog = BackupCatalog(tmp_path / "catalog.db")
+    store_a, store_b = tmp_path / "a" / "Smart Backup", tmp_path / "b" / "Smart Backup"
+    first = catalog.record("a.psd", store_a / "a-1.psd.manifest.json", 1.0, 3, "h1", 'manifest', [["shared", 1], ["only1", 1], ["only1", 1]])
+    catalog.record("a.psd", store_a / "a-2.psd.manifest.json", 2.0, 2, "h2", 'manifest', [["shared", 1], ["only2", 1]])
+    catalog.record("b.psd", store_b / "b-1.psd.manifest.json", 3.0, 1, "h3", 'manifest', [["only1", 1]])  # same hash, other store
+    copy = catalog.record("c.psd", tmp_path / "c-1.psd", 4.0, 1, None, 'copy')
+    assert catalog.remove([first, copy]) == [(str(store_a), "only1")]
+    assert [b['path'] for b in catalog.for_source("a.psd")] == [str(store_a / "a-2.psd.manifest.json")]
+    catalog.close()
+
+
+def test_prune_deletes_expired_manifests_and_their_unshared_chunks(tmp_path, monkeypatch):
+    monkeypatch.setenv('APPDATA', str(tmp_path / "appdata"))
+    settings = {'smart_backup_dedup': True, 'backup_keep_within_hours': 0,
+                'backup_keep_hourly': 0, 'backup_keep_daily': 0, 'backup_keep_weekly': 0}
+    engine = BackupEngine(lambda *a: None, lambda *a: None, lambda: settings)
+    document = tmp_path / "poster.psd"
+    head = os.urandom(2 * 1024 * 1024)
+    document.write_bytes(head + os.urandom(1024 * 1024))
+    first = engine.submit(document).result()
+    document.write_bytes(head + os.urandom(1024 * 1024))
+    st = os.stat(document)
+    os.utime(document, ns=(st.st_atime_ns, st.st_mtime_ns + 1))  # same size: make sure it isn't taken as unchanged
+    second = engine.submit(document).result()
+    engine.shutdown()
+
+    assert not first.exists()  # only the newest survives with every period at 0
+    assert [b['path'] for b in engine.catalog.for_source(str(document))] == [str(second)]
+    kept = {d for d, _ in json.loads(second.read_text())['chunks']}
+    store = BackupStore(second.parent)
+    on_disk = {p.name for p in store.chunk_dir.rglob("*") if p.is_file()}
+    assert on_disk == kept and len(kept) > 1
+    assert store.restore(second, tmp_path / "restored.psd").read_bytes() == document.read_bytes()
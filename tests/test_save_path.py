@@ -0,0 +1,117 @@
+import os
+
+import pytest
+
+from app import (AutoSaveScript, DocumentResolver, RecordingInputInjector, SaveTracker, Scheduler, SimulatedFocusBackend,
+                 WindowInfo)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FixedResolver(DocumentResolver):
+    def __init__(self, path):
+        super().__init__()
+        self.path = path
+
+    def resolve(self, info):
+        return self.path
+
+
+class FailingInjector(RecordingInputInjector):
+    def hotkey(self, *keys):
+        raise OSError("injection blocked")
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    monkeypatch.setenv('APPDATA', str(tmp_path / "appdata"))
+    document = tmp_path / "poster.fig"
+    document.write_bytes(b"design")
+    clock = FakeClock()
+    scheduler = Scheduler(clock)
+    backend = SimulatedFocusBackend()
+    made = []
+
+    def make(injector=None):
+        script = AutoSaveScript(lambda delay, callback: callback(), backend, injector or RecordingInputInjector(clock),
+                                scheduler, FixedResolver(document))
+        logs = []
+        script.events.subscribe(lambda kind, *args: logs.append(args[0]) if kind == 'log' else None)
+        script.process_monitor.start_monitoring(script._check_active_window)
+        made.append(script)
+        return script, logs
+
+    def advance(seconds):
+        end = clock.now + seconds
+        while True:
+            wait = scheduler.run_pending()
+            if wait is None or clock.now + wait > end:
+                break
+            clock.now += wait
+        clock.now = end
+
+    yield make, backend, advance, document
+    for script in made:
+        script.cleanup()
+
+
+def test_idle_document_without_title_marker_is_not_reported_as_missed(engine):
+    make, backend, advance, _ = engine
+    script, logs = make()
+    backend.focus(os.getpid(), 'figma.exe', "poster - Figma")
+    advance(120)
+    assert script.saves_injected > 0
+    assert script.save_tracker.noop_saves > 0
+    assert script.saves_unconfirmed == 0
+    assert not any("not confirmed" in line for line in logs)
+
+
+def test_unwritten_save_of_marked_document_is_reported_as_missed(engine):
+    make, backend, advance, _ = engine
+    script, logs = make()
+    backend.focus(os.getpid(), 'figma.exe', "poster* - Figma")
+    advance(40)
+    assert script.saves_unconfirmed == 1
+    assert any("not confirmed" in line for line in logs)
+
+
+def test_failed_injection_does_not_report_a_save(engine):
+    make, backend, advance, _ = engine
+    script, logs = make(FailingInjector())
+    backend.focus(os.getpid(), 'figma.exe', "poster* - Figma")
+    advance(40)
+    assert script.save_failures > 0 and script.saves_injected == 0
+    assert "Auto-Save command failed." in logs
+    assert not any(line.startswith("Auto-saved") for line in logs)
+    assert script.saves_unconfirmed == 0
+
+
+def test_save_cancelled_after_decision_is_not_counted_as_noop(tmp_path):
+    document = tmp_path / "poster.fig"
+    document.write_bytes(b"design")
+    tracker = SaveTracker(FixedResolver(document))
+    info = WindowInfo('figma.exe', "poster - Figma", os.getpid())
+    assert tracker.should_save(info)  # e.g. the focus guard then cancels the keystroke
+    assert tracker.should_save(info)
+    assert tracker.noop_saves == 0 and tracker.saves_sent == 0
+    tracker.record_sent()
+    assert tracker.should_save(info)  # the sent save left the file alone ...
+    assert tracker.noop_saves == 1
+    tracker.record_sent()
+    assert not tracker.should_save(info)  # ... so the tick after the next one is skipped
+    assert tracker.saves_sent == 2
+
+
+def test_failed_injection_does_not_back_off(engine):
+    make, backend, advance, _ = engine
+    script, _ = make(FailingInjector())
+    backend.focus(os.getpid(), 'figma.exe', "poster - Figma")
+    advance(60)
+    assert script.save_tracker.noop_saves == 0
+    assert script.save_tracker.saves_skipped == 0
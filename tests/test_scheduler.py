@@ -0,0 +1,72 @@
+from app import Scheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_scheduler():
+    clock = FakeClock()
+    return clock, Scheduler(clock)
+
+
+def test_periodic_job_rearms_from_due_time_without_drift():
+    clock, scheduler = make_scheduler()
+    runs = []
+    scheduler.schedule('tick', 3, lambda: runs.append(clock.now))
+    for now in (3.4, 6.2, 9.9):  # each run starts late; the next due time must not slide
+        clock.now = now
+        scheduler.run_pending()
+    assert runs == [3.4, 6.2, 9.9]
+    assert scheduler.run_pending() == 12 - 9.9
+
+
+def test_missed_ticks_are_skipped_not_replayed():
+    clock, scheduler = make_scheduler()
+    runs = []
+    scheduler.schedule('tick', 3, lambda: runs.append(clock.now))
+    clock.now = 10.0
+    scheduler.run_pending()
+    assert runs == [10.0]
+    assert scheduler.run_pending() == 2.0  # next tick stays on the 3 s grid
+
+
+def test_cancel_drops_job():
+    clock, scheduler = make_scheduler()
+    runs = []
+    scheduler.schedule('tick', 3, lambda: runs.append(clock.now))
+    scheduler.cancel('tick')
+    clock.now = 30.0
+    assert scheduler.run_pending() is None
+    assert runs == []
+    assert not scheduler.is_scheduled('tick')
+
+
+def test_reschedule_changes_interval_and_keeps_callback():
+    clock, scheduler = make_scheduler()
+    runs = []
+    scheduler.schedule('tick', 3, lambda: runs.append(clock.now))
+    clock.now = 1.0
+    assert scheduler.reschedule('tick', 10)
+    clock.now = 4.0
+    scheduler.run_pending()
+    assert runs == []
+    clock.now = 11.0
+    scheduler.run_pending()
+    assert runs == [11.0]
+    assert not scheduler.reschedule('missing', 5)
+
+
+def test_scheduling_same_name_coalesces():
+    clock, scheduler = make_scheduler()
+    runs = []
+    scheduler.schedule('job', 5, lambda: runs.append('first'), periodic=False)
+    scheduler.schedule('job', 5, lambda: runs.append('second'), periodic=False)
+    clock.now = 5.0
+    scheduler.run_pending()
+    assert runs == ['second']
+    assert scheduler.run_pending() is None
@@ -0,0 +1,37 @@
+import json
+import os
+
+from app import AutoSaveScript, RecordingInputInjector, Scheduler, SettingsManager, SimulatedFocusBackend
+
+
+def test_reload_picks_up_external_edits_and_snapshot_reflects_them(tmp_path, monkeypatch):
+    monkeypatch.setenv('APPDATA', str(tmp_path))
+    manager = SettingsManager()
+    manager.load()
+    manager.flush()
+    assert manager.reload_if_changed() is manager.settings  # unchanged file: nothing re-read
+    path = manager._path
+    edited = dict(json.loads(path.read_text()), auto_save_interval=9)
+    path.write_text(json.dumps(edited))
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    version = manager.version
+    manager.reload_if_changed()
+    assert manager.reload_count == 1
+    assert manager.snapshot() == (version + 1, manager.settings)
+    assert manager.settings['auto_save_interval'] == 9
+
+
+def test_focus_switch_does_not_touch_the_settings_file(tmp_path, monkeypatch):
+    monkeypatch.setenv('APPDATA', str(tmp_path))
+    backend = SimulatedFocusBackend()
+    script = AutoSaveScript(lambda delay, callback: callback(), backend, RecordingInputInjector(), Scheduler(lambda: 0.0))
+    script.process_monitor.start_monitoring(script._check_active_window)
+    def no_disk(*args):
+        raise AssertionError("settings file touched on the focus path")
+    manager = script.settings_manager
+    manager._file_stamp = manager.load = no_disk
+    backend.focus(os.getpid(), 'photoshop.exe', "poster.psd")
+    assert script.current_app == "Photoshop"
+    del manager._file_stamp, manager.load
+    script.cleanup()
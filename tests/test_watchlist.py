@@ -0,0 +1,17 @@
+from app import WatchlistMatcher
+
+
+def test_exact_glob_and_title_rules():
+    matcher = WatchlistMatcher(["Photoshop.exe", "suite_*.exe", "title:*project ?1*"])
+    assert matcher.matches("photoshop.exe")
+    assert matcher.matches("suite_2025.exe", "Untitled")
+    assert matcher.matches("chrome.exe", "Tab - Project A1 notes")
+    assert not matcher.matches("chrome.exe", "Tab - Project 2 notes")
+    assert not matcher.matches("suite.exe")
+
+
+def test_empty_patterns_match_nothing():
+    matcher = WatchlistMatcher(["title:", "title:   ", "", "  "])
+    assert not matcher.matches("foo.exe", "")
+    assert not matcher.matches("foo.exe", "Untitled")
+    assert not matcher.matches("", "")